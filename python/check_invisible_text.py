@@ -4,204 +4,195 @@
 #     "PyMuPDF",
 # ]
 # ///
-import fitz  # PyMuPDF
+import argparse
+import hashlib
+import json
+import os
 import re
-from typing import List, Dict, Tuple
-
-
-def detect_invisible_text(pdf_path: str) -> Dict[str, List]:
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    # Newer PyMuPDF prints a deprecation warning to stdout on "import fitz"
+    import pymupdf as fitz
+except ImportError:
+    import fitz  # PyMuPDF
+
+CATEGORIES = (
+    "transparent_text",
+    "off_page_text",
+    "zero_size_text",
+    "white_text_on_white",
+    "hidden_text",
+)
+WHITE = 0xFFFFFF
+# Anything at or below this font size is practically invisible
+MIN_FONT_SIZE = 0.5
+# Long documents are split into page ranges of at least this many pages,
+# several per worker so a slow range does not leave the others idle
+MIN_PAGES_PER_SHARD = 16
+SHARDS_PER_WORKER = 4
+# Bump when detection changes so cached batch results are recomputed
+CACHE_VERSION = 1
+
+
+def detect_invisible_text(pdf_path: str, jobs: int = 1) -> Dict[str, List]:
     """
     Detect various types of invisible text in a PDF using PyMuPDF.
 
-    Returns a dictionary with different categories of invisible text found.
+    Pages are scanned in ranges across jobs worker processes. Returns a
+    dictionary with different categories of invisible text found.
     """
-    doc = fitz.open(pdf_path)
-    results = {
-        "transparent_text": [],
-        "off_page_text": [],
-        "zero_size_text": [],
-        "white_text_on_white": [],
-        "hidden_text": [],
-        "summary": {},
-    }
+    with fitz.open(pdf_path) as doc:
+        page_count = len(doc)
+
+    shards = page_ranges(page_count, jobs)
+    if len(shards) <= 1:
+        shard_results = [scan_pages(pdf_path, 0, page_count)]
+    else:
+        starts, stops = zip(*shards)
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            shard_results = list(
+                executor.map(scan_pages, repeat(pdf_path), starts, stops)
+            )
 
-    for page_num in range(len(doc)):
-        page = doc[page_num]
-        page_rect = page.rect
+    # Shards come back in page order, so each category stays sorted by page
+    results = {category: [] for category in CATEGORIES}
+    for shard in shard_results:
+        for category in CATEGORIES:
+            results[category].extend(shard[category])
+    results["summary"] = summarize(results)
+    return results
 
-        # Get all text with detailed formatting information
-        text_dict = page.get_text("dict")
 
-        # Method 1: Check for transparent or nearly transparent text
-        transparent_text = check_transparent_text(text_dict, page_num)
-        results["transparent_text"].extend(transparent_text)
+def page_ranges(page_count: int, jobs: int) -> List[Tuple[int, int]]:
+    """Split page_count pages into (start, stop) ranges for jobs workers."""
+    if jobs <= 1 or page_count < 2 * MIN_PAGES_PER_SHARD:
+        return [(0, page_count)]
+    size = max(MIN_PAGES_PER_SHARD, -(-page_count // (jobs * SHARDS_PER_WORKER)))
+    return [
+        (start, min(start + size, page_count))
+        for start in range(0, page_count, size)
+    ]
 
-        # Method 2: Check for text positioned outside visible page area
-        off_page_text = check_off_page_text(text_dict, page_rect, page_num)
-        results["off_page_text"].extend(off_page_text)
 
-        # Method 3: Check for zero or very small font sizes
-        zero_size_text = check_zero_size_text(text_dict, page_num)
-        results["zero_size_text"].extend(zero_size_text)
+def scan_pages(pdf_path: str, start: int, stop: int) -> Dict[str, List]:
+    """Scan pages start to stop - 1, returning findings for each category."""
+    results = {category: [] for category in CATEGORIES}
+    with fitz.open(pdf_path) as doc:
+        for page_num in range(start, stop):
+            scan_page(doc[page_num], page_num, results)
+    return results
 
-        # Method 4: Check for white text (often invisible on white backgrounds)
-        white_text = check_white_text(text_dict, page_num)
-        results["white_text_on_white"].extend(white_text)
 
-        # Method 5: Compare extracted text vs visible text
-        hidden_text = check_hidden_text(page, page_num)
-        results["hidden_text"].extend(hidden_text)
+def scan_page(page: fitz.Page, page_num: int, results: Dict[str, List]):
+    """Add the findings for a single page to results."""
+    page_rect = page.rect
+    # Lay out the page text once and reuse it for every extraction below
+    textpage = page.get_textpage()
+    text_dict = page.get_text("dict", textpage=textpage)
 
-    doc.close()
+    for block in text_dict.get("blocks", []):
+        for line in block.get("lines", ()):
+            for span in line.get("spans", ()):
+                # Every check ignores spans with no visible characters
+                text_content = span.get("text", "").strip()
+                if not text_content:
+                    continue
+                for category, item in classify_span(
+                    span, text_content, page_rect, page_num
+                ):
+                    results[category].append(item)
+
+    # Compare extracted text vs visible text
+    results["hidden_text"].extend(check_hidden_text(page, page_num, textpage))
+
+
+def classify_span(
+    span: Dict, text_content: str, page_rect: fitz.Rect, page_num: int
+) -> Iterator[Tuple[str, Dict]]:
+    """Yield (category, finding) for each way a text span could be invisible."""
+    bbox = span.get("bbox")
+    color = span.get("color", 0)
+
+    # Transparent or nearly transparent text
+    if color is not None:
+        # Extract RGB values (PyMuPDF uses integer color values)
+        r = (color >> 16) & 255
+        g = (color >> 8) & 255
+        b = color & 255
+        if r > 250 and g > 250 and b > 250:
+            yield "transparent_text", {
+                "page": page_num,
+                "text": text_content,
+                "color": f"RGB({r}, {g}, {b})",
+                "bbox": bbox,
+                "reason": "Very light/white text color",
+            }
 
-    # Generate summary
-    total_invisible = sum(
-        len(category) for category in results.values() if isinstance(category, list)
-    )
-    results["summary"] = {
-        "total_invisible_text_instances": total_invisible,
+    # Text positioned completely outside the visible page area
+    if bbox and not fitz.Rect(bbox).intersects(page_rect):
+        yield "off_page_text", {
+            "page": page_num,
+            "text": text_content,
+            "bbox": bbox,
+            "page_rect": tuple(page_rect),
+            "reason": "Text positioned outside page boundaries",
+        }
+
+    # Zero or very small font sizes
+    font_size = span.get("size", 0)
+    if font_size <= MIN_FONT_SIZE:
+        yield "zero_size_text", {
+            "page": page_num,
+            "text": text_content,
+            "font_size": font_size,
+            "bbox": bbox,
+            "reason": f"Font size too small: {font_size}",
+        }
+
+    # White text, often invisible on white backgrounds
+    if color == WHITE:
+        yield "white_text_on_white", {
+            "page": page_num,
+            "text": text_content,
+            "color": "White (RGB(255, 255, 255))",
+            "bbox": bbox,
+            "reason": "White text (invisible on white background)",
+        }
+
+
+def summarize(results: Dict[str, List]) -> Dict:
+    """Count the findings across every category."""
+    return {
+        "total_invisible_text_instances": sum(
+            len(results[category]) for category in CATEGORIES
+        ),
         "pages_with_invisible_text": len(
             set(
-                item["page"]
-                for category in results.values()
-                if isinstance(category, list)
-                for item in category
+                item["page"] for category in CATEGORIES for item in results[category]
             )
         ),
-        "types_found": [
-            key
-            for key, value in results.items()
-            if isinstance(value, list) and len(value) > 0
-        ],
+        "types_found": [category for category in CATEGORIES if results[category]],
     }
 
-    return results
-
-
-def check_transparent_text(text_dict: Dict, page_num: int) -> List[Dict]:
-    """Check for transparent or nearly transparent text."""
-    transparent_texts = []
 
-    for block in text_dict.get("blocks", []):
-        if "lines" in block:
-            for line in block["lines"]:
-                for span in line.get("spans", []):
-                    # Check text color for transparency
-                    color = span.get("color", 0)
-                    if color is not None:
-                        # Extract RGB values (PyMuPDF uses integer color values)
-                        r = (color >> 16) & 255
-                        g = (color >> 8) & 255
-                        b = color & 255
-
-                        # Check for very light colors (near white) or specific transparency indicators
-                        if (r > 250 and g > 250 and b > 250) or color == 0xFFFFFF:
-                            text_content = span.get("text", "").strip()
-                            if text_content:
-                                transparent_texts.append(
-                                    {
-                                        "page": page_num,
-                                        "text": text_content,
-                                        "color": f"RGB({r}, {g}, {b})",
-                                        "bbox": span.get("bbox"),
-                                        "reason": "Very light/white text color",
-                                    }
-                                )
-
-    return transparent_texts
-
-
-def check_off_page_text(
-    text_dict: Dict, page_rect: fitz.Rect, page_num: int
+def check_hidden_text(
+    page: fitz.Page, page_num: int, textpage: fitz.TextPage = None
 ) -> List[Dict]:
-    """Check for text positioned outside the visible page area."""
-    off_page_texts = []
-
-    for block in text_dict.get("blocks", []):
-        if "lines" in block:
-            for line in block["lines"]:
-                for span in line.get("spans", []):
-                    bbox = span.get("bbox")
-                    if bbox:
-                        span_rect = fitz.Rect(bbox)
-                        # Check if text is completely outside page boundaries
-                        if not span_rect.intersects(page_rect):
-                            text_content = span.get("text", "").strip()
-                            if text_content:
-                                off_page_texts.append(
-                                    {
-                                        "page": page_num,
-                                        "text": text_content,
-                                        "bbox": bbox,
-                                        "page_rect": tuple(page_rect),
-                                        "reason": "Text positioned outside page boundaries",
-                                    }
-                                )
-
-    return off_page_texts
-
-
-def check_zero_size_text(text_dict: Dict, page_num: int) -> List[Dict]:
-    """Check for text with zero or very small font sizes."""
-    zero_size_texts = []
-
-    for block in text_dict.get("blocks", []):
-        if "lines" in block:
-            for line in block["lines"]:
-                for span in line.get("spans", []):
-                    font_size = span.get("size", 0)
-                    # Check for zero or very small font sizes
-                    if font_size <= 0.5:  # Practically invisible
-                        text_content = span.get("text", "").strip()
-                        if text_content:
-                            zero_size_texts.append(
-                                {
-                                    "page": page_num,
-                                    "text": text_content,
-                                    "font_size": font_size,
-                                    "bbox": span.get("bbox"),
-                                    "reason": f"Font size too small: {font_size}",
-                                }
-                            )
-
-    return zero_size_texts
-
-
-def check_white_text(text_dict: Dict, page_num: int) -> List[Dict]:
-    """Check for white text that might be invisible on white backgrounds."""
-    white_texts = []
-
-    for block in text_dict.get("blocks", []):
-        if "lines" in block:
-            for line in block["lines"]:
-                for span in line.get("spans", []):
-                    color = span.get("color", 0)
-                    if color == 0xFFFFFF or color == 16777215:  # Pure white
-                        text_content = span.get("text", "").strip()
-                        if text_content:
-                            white_texts.append(
-                                {
-                                    "page": page_num,
-                                    "text": text_content,
-                                    "color": "White (RGB(255, 255, 255))",
-                                    "bbox": span.get("bbox"),
-                                    "reason": "White text (invisible on white background)",
-                                }
-                            )
-
-    return white_texts
-
-
-def check_hidden_text(page: fitz.Page, page_num: int) -> List[Dict]:
     """Compare all extractable text vs visually rendered text to find hidden content."""
     hidden_texts = []
 
     # Extract all text (including hidden)
-    all_text = page.get_text()
+    all_text = page.get_text(textpage=textpage)
 
     # Get visible text by rendering the page and using OCR-like extraction
     # This is a simplified approach - in practice, you might want more sophisticated methods
-    visible_text_blocks = page.get_text("blocks")
+    visible_text_blocks = page.get_text("blocks", textpage=textpage)
     visible_text = ""
 
     for block in visible_text_blocks:
@@ -265,23 +256,197 @@ def print_results(results: Dict):
             print()
 
 
-# Example usage
-if __name__ == "__main__":
-    import sys
+def default_cache_dir() -> Path:
+    """Where batch results are cached between runs, one file per document hash."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "check-invisible-text"
 
-    if len(sys.argv) != 2:
-        print("Usage: python script.py <pdf_path>", file=sys.stderr)
-        sys.exit(1)
 
-    pdf_path = sys.argv[1]
+def load_cached_result(cache_file: Optional[Path]) -> Optional[Dict]:
+    """Return the cached results for a document, or None if there are none."""
+    if cache_file is None:
+        return None
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if isinstance(cached, dict) and cached.get("version") == CACHE_VERSION:
+        return cached.get("results")
+    return None
+
+
+def save_cached_result(cache_file: Optional[Path], results: Dict) -> None:
+    """Atomically write the results for a document, ignoring failures."""
+    if cache_file is None:
+        return
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "results": results}, f)
+        os.replace(tmp_path, cache_file)
+    except OSError:
+        pass
+
+
+def scan_document(path: str, cache_dir: Optional[Path]) -> Dict:
+    """
+    Scan one document in a batch worker, returning a JSON-serializable record.
+
+    Documents are identified by the SHA-256 of their content, so a file that
+    has already been scanned - under any name - is read from the cache.
+    """
+    started = time.perf_counter()
+    record = {"path": path}
+    try:
+        with open(path, "rb") as f:
+            digest = hashlib.file_digest(f, "sha256").hexdigest()
+        record["sha256"] = digest
+        cache_file = cache_dir / f"{digest}.json" if cache_dir else None
+        results = load_cached_result(cache_file)
+        record["cached"] = results is not None
+        if results is None:
+            results = detect_invisible_text(path)
+            save_cached_result(cache_file, results)
+        record["seconds"] = round(time.perf_counter() - started, 4)
+        record["results"] = results
+    except Exception as e:
+        record["seconds"] = round(time.perf_counter() - started, 4)
+        record["error"] = str(e)
+    return record
+
+
+def iter_batch_paths(source: str) -> Iterator[str]:
+    """
+    Yield the documents to scan from a directory (every PDF in it, recursively)
+    or a file listing one path per line, with "-" meaning standard input.
+    """
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(".pdf"):
+                    yield os.path.join(root, name)
+        return
+    f = sys.stdin if source == "-" else open(source, "r", encoding="utf-8")
+    with f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
+
+
+def scan_batch(
+    paths: Iterable[str], jobs: int, cache_dir: Optional[Path]
+) -> Iterator[Dict]:
+    """
+    Scan documents across a pool of warm worker processes, yielding a record
+    for each one as soon as it finishes.
 
+    Only a few documents per worker are queued at a time, so paths can be
+    streamed in from a list of any length.
+    """
+    paths = iter(paths)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = set()
+        for path in paths:
+            pending.add(executor.submit(scan_document, path, cache_dir))
+            if len(pending) >= jobs * 4:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def run_batch(source: str, jobs: int, cache_dir: Optional[Path]) -> int:
+    """Print one JSON line per document and a summary to stderr; return the exit code."""
+    started = time.perf_counter()
+    scanned = cached = flagged = errors = 0
     try:
-        results = detect_invisible_text(pdf_path)
-        print_results(results)
+        for record in scan_batch(iter_batch_paths(source), jobs, cache_dir):
+            print(json.dumps(record), flush=True)
+            scanned += 1
+            if "error" in record:
+                errors += 1
+                continue
+            cached += record["cached"]
+            if record["results"]["summary"]["total_invisible_text_instances"]:
+                flagged += 1
+    except OSError as e:
+        print(f"Error reading {source}: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - started
+    print(
+        f"Scanned {scanned} documents ({cached} cached, {errors} errors) in "
+        f"{elapsed:.1f}s - {flagged} with invisible text",
+        file=sys.stderr,
+    )
+    return 1 if errors else 0
+
 
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check a PDF file for possible instances of invisible text."
+    )
+    parser.add_argument("pdf_path", nargs="?", help="PDF file to check")
+    parser.add_argument(
+        "--batch",
+        metavar="SOURCE",
+        help="Scan every PDF in a directory, or each path listed in a file "
+        "('-' for stdin), printing one JSON line per document",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes for page sharding and batch mode "
+        "(default: CPU count)",
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Output the results as JSON"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="Directory for cached batch results (default: "
+        "~/.cache/check-invisible-text)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Rescan every document in batch mode, ignoring cached results",
+    )
+    args = parser.parse_args()
+    jobs = max(1, args.jobs)
+
+    if args.batch:
+        if args.pdf_path:
+            parser.error("pass either a PDF file or --batch, not both")
+        cache_dir = None if args.no_cache else args.cache_dir or default_cache_dir()
+        sys.exit(run_batch(args.batch, jobs, cache_dir))
+    if not args.pdf_path:
+        parser.error("a PDF file or --batch is required")
+
+    try:
+        results = detect_invisible_text(args.pdf_path, jobs=jobs)
     except FileNotFoundError:
-        print(f"Error: PDF file '{pdf_path}' not found", file=sys.stderr)
+        print(f"Error: PDF file '{args.pdf_path}' not found", file=sys.stderr)
         sys.exit(1)
     except Exception as e:
         print(f"Error analyzing PDF: {e}", file=sys.stderr)
         sys.exit(1)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ Find recent .jsonl files and optionally publish one as a Gist.
 
 import argparse
 import json
+import os
 import shutil
 import subprocess
 import sys
@@ -15,67 +16,146 @@ from pathlib import Path
 from urllib.parse import quote
 
 
-def find_recent_jsonl_files(folder: Path, limit: int = 10) -> list[tuple[Path, str]]:
-    """Find the most recent .jsonl files recursively, excluding agent files and boring sessions."""
-    results = []
-    for f in folder.glob("**/*.jsonl"):
-        if f.name.startswith("agent-"):
+def default_cache_path() -> Path:
+    """Where session summaries are cached between runs."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "claude-code-to-gist" / "summaries.json"
+
+
+def load_summary_cache(cache_path: Path | None) -> dict:
+    """Load the {path: [size, mtime_ns, summary]} cache, or an empty one."""
+    if cache_path is None:
+        return {}
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_summary_cache(cache_path: Path | None, cache: dict):
+    """Atomically write the summary cache, ignoring failures."""
+    if cache_path is None:
+        return
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+def scan_jsonl_files(folder: Path) -> list[tuple[Path, os.stat_result]]:
+    """Stat every session .jsonl under folder, skipping agent files, without opening any."""
+    found = []
+    stack = [folder]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
             continue
-        summary = get_session_summary(f)
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(Path(entry.path))
+                    elif entry.name.endswith(".jsonl") and not entry.name.startswith("agent-"):
+                        found.append((Path(entry.path), entry.stat()))
+                except OSError:
+                    continue
+    return found
+
+
+def find_recent_jsonl_files(
+    folder: Path, limit: int = 10, cache_path: Path | None = None
+) -> list[tuple[Path, str]]:
+    """Find the most recent .jsonl files recursively, excluding agent files and boring sessions.
+
+    Files are sorted by mtime before anything is read, then summarized newest
+    first until enough interesting sessions have been found. Summaries are
+    cached by (path, size, mtime) so unchanged files are never re-read.
+    """
+    files = scan_jsonl_files(folder)
+    files.sort(key=lambda item: item[1].st_mtime_ns, reverse=True)
+
+    cache = load_summary_cache(cache_path)
+    dirty = False
+    results = []
+    for f, stat in files:
+        key = str(f)
+        cached = cache.get(key)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            summary = cached[2]
+        else:
+            summary = get_session_summary(f)
+            cache[key] = [stat.st_size, stat.st_mtime_ns, summary]
+            dirty = True
         # Skip boring/empty sessions
         if summary.lower() == "warmup" or summary == "(no summary)":
             continue
         results.append((f, summary))
+        if len(results) >= limit:
+            break
+
+    # Drop entries for sessions that no longer exist
+    live = {str(f) for f, _ in files}
+    if any(key not in live for key in cache):
+        cache = {key: value for key, value in cache.items() if key in live}
+        dirty = True
+    if dirty:
+        save_summary_cache(cache_path, cache)
+    return results
+
 
-    # Sort by modification time, most recent first
-    results.sort(key=lambda x: x[0].stat().st_mtime, reverse=True)
-    return results[:limit]
+def truncate_summary(text: str, max_length: int) -> str:
+    if len(text) > max_length:
+        return text[:max_length - 3] + "..."
+    return text
 
 
 def get_session_summary(filepath: Path, max_length: int = 200) -> str:
-    """Extract a human-readable summary from the session file."""
+    """Extract a human-readable summary from the session file.
+
+    A "summary" entry wins wherever it appears, otherwise the first non-meta
+    user message is used. Both are found in a single pass over the file.
+    """
+    first_user_message = None
     try:
         with open(filepath, "r", encoding="utf-8") as f:
             for line in f:
-                line = line.strip()
-                if not line:
+                # Once we have a fallback only summary entries matter, so skip
+                # decoding any line that cannot possibly be one.
+                if first_user_message is not None and '"summary"' not in line:
                     continue
-                try:
-                    obj = json.loads(line)
-                    # First priority: summary type entries
-                    if obj.get("type") == "summary" and obj.get("summary"):
-                        summary = obj["summary"]
-                        if len(summary) > max_length:
-                            return summary[:max_length - 3] + "..."
-                        return summary
-                except json.JSONDecodeError:
-                    continue
-
-        # Second pass: find first non-meta user message
-        with open(filepath, "r", encoding="utf-8") as f:
-            for line in f:
                 line = line.strip()
                 if not line:
                     continue
                 try:
                     obj = json.loads(line)
-                    if (obj.get("type") == "user" and
-                        not obj.get("isMeta") and
-                        obj.get("message", {}).get("content")):
-                        content = obj["message"]["content"]
-                        if isinstance(content, str):
-                            # Clean up the content
-                            content = content.strip()
-                            if content and not content.startswith("<"):
-                                if len(content) > max_length:
-                                    return content[:max_length - 3] + "..."
-                                return content
                 except json.JSONDecodeError:
                     continue
+                if not isinstance(obj, dict):
+                    continue
+                # First priority: summary type entries
+                if obj.get("type") == "summary" and obj.get("summary"):
+                    return truncate_summary(obj["summary"], max_length)
+                if (first_user_message is None and
+                    obj.get("type") == "user" and
+                    not obj.get("isMeta") and
+                    obj.get("message", {}).get("content")):
+                    content = obj["message"]["content"]
+                    if isinstance(content, str):
+                        # Clean up the content
+                        content = content.strip()
+                        if content and not content.startswith("<"):
+                            first_user_message = truncate_summary(content, max_length)
     except Exception:
         pass
 
-    return "(no summary)"
+    return first_user_message or "(no summary)"
 
 
 def get_interesting_lines(filepath: Path, max_lines: int = 5) -> list[dict]:
@@ -285,6 +365,7 @@ def print_file_list(files: list[Path], summaries: list[str]):
 def main():
     parser = argparse.ArgumentParser(description="Find and publish recent .jsonl sessions as Gists")
     parser.add_argument("--list", action="store_true", help="List recent sessions and exit")
+    parser.add_argument("--no-cache", action="store_true", help="Don't read or write the session summary cache")
     args = parser.parse_args()
 
     projects_folder = Path.home() / ".claude" / "projects"
@@ -296,7 +377,8 @@ def main():
     # Find recent .jsonl files recursively (also loads summaries and filters)
     if not args.list:
         print("Loading sessions...", end="", flush=True)
-    results = find_recent_jsonl_files(projects_folder, limit=10)
+    cache_path = None if args.no_cache else default_cache_path()
+    results = find_recent_jsonl_files(projects_folder, limit=10, cache_path=cache_path)
     if not args.list:
         sys.stdout.write('\r\x1b[2K')
 
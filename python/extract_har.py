@@ -5,13 +5,216 @@
 # ]
 # ///
 
+import base64
+import hashlib
+import io
 import json
+import os
+import re
+import sqlite3
+import threading
+import time
 import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 import click
 import mimetypes
 from urllib.parse import urlparse
 
+# The HAR is decoded this many characters at a time
+CHUNK_SIZE = 1 << 16
+WHITESPACE = re.compile(r"\s*")
+decoder = json.JSONDecoder()
+# Bodies of these types are added to the full-text index
+TEXT_MIMETYPE = re.compile(r"^text/|json|javascript|xml", re.IGNORECASE)
+SIZE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([kmg]?)i?b?\s*$", re.IGNORECASE)
+INDEX_SCHEMA = """
+CREATE TABLE archive (
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    har_name TEXT NOT NULL,
+    fts INTEGER NOT NULL
+);
+CREATE TABLE entries (
+    id INTEGER PRIMARY KEY,
+    started TEXT,
+    method TEXT,
+    url TEXT,
+    host TEXT,
+    status INTEGER,
+    mime_type TEXT,
+    size INTEGER,
+    time REAL,
+    wait REAL,
+    receive REAL,
+    body_file TEXT,
+    entry_offset INTEGER NOT NULL,
+    entry_length INTEGER NOT NULL
+);
+CREATE INDEX entries_host ON entries (host);
+CREATE INDEX entries_mime_type_size ON entries (mime_type, size);
+CREATE INDEX entries_size ON entries (size);
+"""
+
+
+class JSONStream:
+    """
+    Walk a JSON document read incrementally from a text stream.
+
+    Only the value currently being decoded is held in memory, so a single
+    entry can be pulled out of a large array without parsing the rest.
+    """
+
+    def __init__(self, stream, chunk_size=CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        # UTF-8 byte offset of buffer[self._mark], advanced by tell()
+        self._offset = 0
+        self._mark = 0
+
+    def tell(self):
+        """Return the byte offset of the current position in UTF-8 input."""
+        self._offset += len(self.buffer[self._mark : self.pos].encode("utf-8"))
+        self._mark = self.pos
+        return self._offset
+
+    def _fill(self, size):
+        """Read at least size more characters, returning False at EOF."""
+        if self.eof:
+            return False
+        # Drop everything that has already been consumed
+        self.tell()
+        self.buffer = self.buffer[self.pos :]
+        self.pos = self._mark = 0
+        more = self.stream.read(max(size, self.chunk_size))
+        if not more:
+            self.eof = True
+            return False
+        self.buffer += more
+        return True
+
+    def peek(self):
+        """Skip whitespace and return the next character, or "" at EOF."""
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill(self.chunk_size):
+                return ""
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} but found {found or 'EOF'!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete value."""
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # Probably cut off at the end of the buffer - read more, at
+                # least doubling it so a huge value costs linear time
+                if self._fill(len(self.buffer) - self.pos):
+                    continue
+                raise
+            # A number could continue into the next chunk
+            if end == len(self.buffer) and self._fill(self.chunk_size):
+                continue
+            self.pos = end
+            return value
+
+    def object_keys(self):
+        """
+        Yield the keys of the object starting here. The caller must consume
+        each key's value, with value() or by walking into it, before the
+        next key is read.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("}")
+            return
+
+    def array_items(self, offsets=False):
+        """
+        Yield each decoded item of the array starting here - or with offsets,
+        (item, start, end) where start and end are its UTF-8 byte offsets.
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            if offsets:
+                start = self.tell()
+                item = self.value()
+                yield item, start, self.tell()
+            else:
+                yield self.value()
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("]")
+            return
+
+
+def iter_har_entries(stream, offsets=False):
+    """
+    Yield the entries in log.entries of a HAR text stream one at a time,
+    as (entry, start, end) byte offsets if offsets is true.
+    """
+    reader = JSONStream(stream)
+    # json.loads() accepts a UTF-8 byte order mark, so skip one here too.
+    # It is decoded as a character rather than stripped by utf-8-sig so
+    # that it still counts towards the byte offsets
+    if reader.peek() == "\ufeff":
+        reader.pos += 1
+    for key in reader.object_keys():
+        if key != "log":
+            reader.value()
+            continue
+        for log_key in reader.object_keys():
+            if log_key == "entries":
+                yield from reader.array_items(offsets)
+            else:
+                reader.value()
+
+
+def open_har(harzip):
+    """
+    Open a HAR archive, returning (zf, raw, har_name): zf is the ZipFile
+    for the zipped layout or None for a plain .har, and raw is the HAR
+    document as a binary stream. Raises KeyError if a zip has no har.har.
+    """
+    if zipfile.is_zipfile(harzip):
+        zf = zipfile.ZipFile(harzip)
+        try:
+            return zf, zf.open("har.har"), "har.har"
+        except KeyError:
+            zf.close()
+            raise
+    return None, open(harzip, "rb"), Path(harzip).name
+
+
+def har_text(raw):
+    # newline="" keeps \r\n intact so byte offsets stay accurate
+    return io.TextIOWrapper(raw, encoding="utf-8", newline="")
+
 
 def get_extension_for_mimetype(mimetype):
     """Get the most common file extension for a given MIME type."""
@@ -45,7 +248,172 @@ def extract_path_from_url(url):
     return path
 
 
-@click.command()
+def output_path(output_dir, url, mimetype, file_ref, paths):
+    """Where to write a body: under its URL path, or its name in the archive."""
+    if paths or not file_ref:
+        # Use URL path for filename
+        path = extract_path_from_url(url)
+        # Add appropriate extension if not present
+        if not Path(path).suffix:
+            path += get_extension_for_mimetype(mimetype)
+        return output_dir / path
+    # Use original filename
+    return output_dir / file_ref
+
+
+def read_body(content, zf):
+    """
+    Return the response body for a HAR content object as bytes: read from
+    the archive for the zipped "_file" layout, otherwise decoded from the
+    inline "text" (base64 or plain). Returns None if there is no body.
+    """
+    file_ref = content.get("_file")
+    if file_ref and zf is not None:
+        return zf.read(file_ref)
+    text = content.get("text")
+    if text is None:
+        return None
+    if content.get("encoding") == "base64":
+        return base64.b64decode(text)
+    return text.encode("utf-8")
+
+
+class Extractor:
+    """
+    Write response bodies from a pool of threads, storing each distinct
+    body once: later copies are hard links to a file already holding it.
+    """
+
+    def __init__(self, zf, pretty_json):
+        self.zf = zf
+        self.pretty_json = pretty_json
+        # The digest of the body each path currently holds, and the paths
+        # currently holding each digest - a path can be overwritten by a
+        # later entry with the same URL path
+        self._holds = {}
+        self._holders = {}
+        # The index of the latest entry written to each path, so that when
+        # several entries share a path the last one wins, as it would if
+        # they were written one after another
+        self._written = {}
+        self._path_locks = {}
+        self._lock = threading.Lock()
+        self.extracted = 0
+        self.linked = 0
+
+    def _locks_for(self, paths):
+        # Always taken in sorted order so two threads cannot deadlock
+        with self._lock:
+            return [
+                self._path_locks.setdefault(path, threading.Lock())
+                for path in sorted(set(paths))
+            ]
+
+    def extract(self, content, outpath, index):
+        try:
+            file_content = read_body(content, self.zf)
+        except KeyError:
+            click.echo(
+                f"Warning: File {content.get('_file')} not found in archive",
+                err=True,
+            )
+            return
+        except ValueError:
+            click.echo(f"Warning: Could not decode body for {outpath}", err=True)
+            return
+        if file_content is None:
+            return
+
+        # Handle JSON pretty printing if requested
+        if self.pretty_json and content["mimeType"] == "application/json":
+            try:
+                json_data = json.loads(file_content)
+                file_content = json.dumps(json_data, indent=2).encode("utf-8")
+            except json.JSONDecodeError:
+                click.echo(
+                    f"Warning: Could not pretty print {outpath} - invalid JSON",
+                    err=True,
+                )
+
+        digest = hashlib.sha256(file_content).digest()
+        with self._lock:
+            source = next(
+                (path for path in self._holders.get(digest, ()) if path != outpath),
+                None,
+            )
+        locks = self._locks_for([outpath] if source is None else [outpath, source])
+        for lock in locks:
+            lock.acquire()
+        try:
+            with self._lock:
+                if self._written.get(outpath, -1) > index:
+                    # A later entry for this path has already been written
+                    return
+                self._written[outpath] = index
+                if self._holds.get(outpath) == digest:
+                    return
+                # Another thread may have replaced the source meanwhile
+                if source is not None and self._holds.get(source) != digest:
+                    source = None
+
+            # Ensure parent directories exist
+            outpath.parent.mkdir(parents=True, exist_ok=True)
+            # Never write into an existing file in place: it may be a hard
+            # link shared with other paths
+            tmp_path = outpath.with_name(
+                f".{outpath.name}.{threading.get_ident()}.tmp"
+            )
+            linked = False
+            if source is not None:
+                try:
+                    tmp_path.unlink(missing_ok=True)
+                    os.link(source, tmp_path)
+                    linked = True
+                except OSError:
+                    # Hard links are not supported here - write a copy instead
+                    pass
+            if not linked:
+                tmp_path.write_bytes(file_content)
+            os.replace(tmp_path, outpath)
+
+            with self._lock:
+                previous = self._holds.get(outpath)
+                if previous is not None:
+                    self._holders[previous].pop(outpath, None)
+                self._holds[outpath] = digest
+                self._holders.setdefault(digest, {})[outpath] = None
+                if linked:
+                    self.linked += 1
+                else:
+                    self.extracted += 1
+        finally:
+            for lock in locks:
+                lock.release()
+
+        if linked:
+            click.echo(f"Linked: {outpath} (same content as {source})")
+        else:
+            click.echo(f"Extracted: {outpath}")
+
+
+class DefaultGroup(click.Group):
+    """Runs the extract command when the first argument is not a command."""
+
+    def parse_args(self, ctx, args):
+        if args and args[0] not in self.commands and args[0] not in ctx.help_option_names:
+            args.insert(0, "extract")
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=DefaultGroup)
+def cli():
+    """Extract bodies from HAR archives, or index and query them.
+
+    Runs extract if no command is given.
+    """
+
+
+@cli.command(name="extract")
 @click.argument("harzip", type=click.Path(exists=True))
 @click.argument("mimetypes", nargs=-1, required=True)
 @click.option(
@@ -65,75 +433,372 @@ def extract_path_from_url(url):
     is_flag=True,
     help="Pretty print JSON files with 2-space indentation",
 )
-def extract_har(harzip, mimetypes, output, paths, pretty_json):
-    """Extract files of specified MIME types from a HAR archive."""
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Number of threads writing files",
+)
+def extract_har(harzip, mimetypes, output, paths, pretty_json, jobs):
+    """Extract files of specified MIME types from a HAR archive.
+
+    HARZIP can be a zip with the bodies stored alongside har.har, or a
+    plain .har file with the bodies inline.
+    """
     output_dir = Path(output)
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    with zipfile.ZipFile(harzip) as zf:
-        # Read the HAR JSON file
+    try:
+        zf, raw, har_name = open_har(harzip)
+    except KeyError:
+        click.echo("Error: har.har not found in archive", err=True)
+        return
+
+    extractor = Extractor(zf, pretty_json)
+    with raw, ThreadPoolExecutor(max_workers=jobs) as executor:
+        pending = set()
         try:
-            har_content = json.loads(zf.read("har.har"))
-        except KeyError:
-            click.echo("Error: har.har not found in archive", err=True)
-            return
-        except json.JSONDecodeError:
-            click.echo("Error: Invalid JSON in har.har", err=True)
-            return
+            for index, entry in enumerate(iter_har_entries(har_text(raw))):
+                if not isinstance(entry, dict):
+                    continue
+                response = entry.get("response", {})
+                content = response.get("content", {})
 
-        # Process each entry
-        for entry in har_content.get("log", {}).get("entries", []):
-            response = entry.get("response", {})
-            content = response.get("content", {})
+                # Check if this entry matches our MIME type filter
+                if content.get("mimeType") not in mimetypes:
+                    continue
 
-            # Check if this entry matches our MIME type filter
-            if content.get("mimeType") not in mimetypes:
-                continue
+                file_ref = content.get("_file") if zf is not None else None
+                if not file_ref and content.get("text") is None:
+                    continue
 
-            # Get the file reference and URL
-            file_ref = content.get("_file")
-            if not file_ref:
-                continue
+                request_url = entry.get("request", {}).get("url", "")
+                outpath = output_path(
+                    output_dir, request_url, content["mimeType"], file_ref, paths
+                )
 
-            request_url = entry.get("request", {}).get("url", "")
+                pending.add(
+                    executor.submit(extractor.extract, content, outpath, index)
+                )
+                # Only hold a few bodies in memory at once
+                if len(pending) >= jobs * 4:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+        except ValueError:
+            click.echo(f"Error: Invalid JSON in {har_name}", err=True)
+        finally:
+            for future in wait(pending).done:
+                future.result()
+            if zf is not None:
+                zf.close()
+
+    if extractor.linked:
+        click.echo(
+            f"Extracted {extractor.extracted} files, "
+            f"{extractor.linked} duplicates stored as hard links"
+        )
 
-            try:
-                # Extract the file
-                file_content = zf.read(file_ref)
-
-                if paths:
-                    # Use URL path for filename
-                    path = extract_path_from_url(request_url)
-                    # Add appropriate extension if not present
-                    if not Path(path).suffix:
-                        path += get_extension_for_mimetype(content["mimeType"])
-                    outpath = output_dir / path
-                else:
-                    # Use original filename
-                    outpath = output_dir / file_ref
 
-                # Ensure parent directories exist
-                outpath.parent.mkdir(parents=True, exist_ok=True)
+def parse_size(ctx, param, value):
+    """Parse a size such as 1500, 500K or 1MB (powers of 1024) into bytes."""
+    if value is None:
+        return None
+    match = SIZE.match(value)
+    if not match:
+        raise click.BadParameter(f"{value!r} is not a size like 500K or 1MB")
+    number, unit = match.groups()
+    multiplier = 1024 ** ("kmg".index(unit.lower()) + 1) if unit else 1
+    return int(float(number) * multiplier)
 
-                # Handle JSON pretty printing if requested
-                if pretty_json and content["mimeType"] == "application/json":
+
+def index_row(entry_id, entry, start, end, zf):
+    """Build the entries table row for a HAR entry."""
+    request = entry.get("request") or {}
+    response = entry.get("response") or {}
+    content = response.get("content") or {}
+    timings = entry.get("timings") or {}
+    url = request.get("url") or ""
+    # "application/json; charset=utf-8" is indexed as "application/json"
+    mime_type = (content.get("mimeType") or "").split(";")[0].strip().lower()
+    size = content.get("size")
+    return (
+        entry_id,
+        entry.get("startedDateTime"),
+        request.get("method"),
+        url,
+        urlparse(url).hostname,
+        response.get("status"),
+        mime_type or None,
+        size if isinstance(size, int) and size >= 0 else None,
+        entry.get("time"),
+        timings.get("wait"),
+        timings.get("receive"),
+        (content.get("_file") or None) if zf is not None else None,
+        start,
+        end - start,
+    )
+
+
+def build_index(harzip, db_path, fts):
+    """
+    Index every entry in a HAR archive into a new SQLite database, written
+    to a temporary file and moved into place. Returns the number of entries.
+    """
+    tmp_path = db_path.with_name(db_path.name + ".tmp")
+    tmp_path.unlink(missing_ok=True)
+    db = sqlite3.connect(tmp_path)
+    db.executescript(INDEX_SCHEMA)
+    if fts:
+        # Contentless: the bodies stay in the archive, only the index is stored
+        db.execute("CREATE VIRTUAL TABLE entries_fts USING fts5(body, content='')")
+
+    zf, raw, har_name = open_har(harzip)
+    count = 0
+    rows, bodies = [], []
+
+    def flush():
+        db.executemany(
+            f"INSERT INTO entries VALUES ({', '.join('?' * 14)})", rows
+        )
+        if bodies:
+            db.executemany(
+                "INSERT INTO entries_fts (rowid, body) VALUES (?, ?)", bodies
+            )
+        rows.clear()
+        bodies.clear()
+
+    try:
+        with raw:
+            entries = iter_har_entries(har_text(raw), offsets=True)
+            for entry_id, (entry, start, end) in enumerate(entries):
+                if not isinstance(entry, dict):
+                    continue
+                row = index_row(entry_id, entry, start, end, zf)
+                rows.append(row)
+                count += 1
+                if fts and TEXT_MIMETYPE.search(row[6] or ""):
+                    content = (entry.get("response") or {}).get("content") or {}
                     try:
-                        json_data = json.loads(file_content)
-                        file_content = json.dumps(json_data, indent=2).encode("utf-8")
-                    except json.JSONDecodeError:
-                        click.echo(
-                            f"Warning: Could not pretty print {outpath} - invalid JSON",
-                            err=True,
-                        )
-
-                # Write the file
-                outpath.write_bytes(file_content)
-                click.echo(f"Extracted: {outpath}")
-
-            except KeyError:
-                click.echo(f"Warning: File {file_ref} not found in archive", err=True)
-                continue
+                        body = read_body(content, zf)
+                    except (KeyError, ValueError):
+                        body = None
+                    if body:
+                        bodies.append((entry_id, body.decode("utf-8", "replace")))
+                if len(rows) >= 1000:
+                    flush()
+        flush()
+        stat = os.stat(harzip)
+        db.execute(
+            "INSERT INTO archive VALUES (?, ?, ?, ?, ?)",
+            (os.path.abspath(harzip), stat.st_size, stat.st_mtime_ns, har_name, fts),
+        )
+        db.commit()
+    except BaseException:
+        db.close()
+        tmp_path.unlink(missing_ok=True)
+        raise
+    finally:
+        if zf is not None:
+            zf.close()
+    db.close()
+    os.replace(tmp_path, db_path)
+    return count
+
+
+@cli.command()
+@click.argument("harzip", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "-d",
+    "--database",
+    type=click.Path(dir_okay=False),
+    help="SQLite file to create (default: HARZIP with a .db extension)",
+)
+@click.option("--fts", is_flag=True, help="Also build a full-text index of text bodies")
+def index(harzip, database, fts):
+    """Build a SQLite index with one row per entry in a HAR archive.
+
+    Each row records the URL, method, status, MIME type, size and timings of
+    an entry, plus where its body is in the archive - so query can find
+    entries without reading any bodies.
+    """
+    db_path = Path(database) if database else Path(harzip).with_suffix(".db")
+    try:
+        count = build_index(harzip, db_path, fts)
+    except KeyError:
+        raise click.ClickException("har.har not found in archive")
+    except ValueError:
+        raise click.ClickException(f"Invalid JSON in {harzip}")
+    click.echo(f"Indexed {count} entries into {db_path}")
+
+
+def read_entry_content(row, zf, har_stream):
+    """Return the HAR content object for an indexed entry."""
+    if row["body_file"]:
+        return {"_file": row["body_file"], "mimeType": row["mime_type"]}
+    har_stream.seek(row["entry_offset"])
+    entry = json.loads(har_stream.read(row["entry_length"]))
+    content = dict((entry.get("response") or {}).get("content") or {})
+    content["mimeType"] = row["mime_type"]
+    return content
+
+
+@cli.command()
+@click.argument("database", type=click.Path(exists=True, dir_okay=False))
+@click.option("--host", help="Host name, * is a wildcard - e.g. 'api.*'")
+@click.option("--url", "url_pattern", help="URL, * is a wildcard")
+@click.option(
+    "--mime",
+    "mime_types",
+    multiple=True,
+    help="MIME type, * is a wildcard - e.g. 'image/*' (can be repeated)",
+)
+@click.option("--method", help="HTTP method")
+@click.option("--status", type=int, multiple=True, help="Status code (can be repeated)")
+@click.option("--min-size", callback=parse_size, help="Minimum body size - e.g. 1MB")
+@click.option("--max-size", callback=parse_size, help="Maximum body size")
+@click.option("--search", help="Full-text search of text bodies (needs index --fts)")
+@click.option("--where", help="Extra SQL condition on the entries table")
+@click.option("--limit", type=click.IntRange(min=1), help="Return at most this many")
+@click.option("--json", "as_json", is_flag=True, help="Output one JSON object per entry")
+@click.option(
+    "-x",
+    "--extract",
+    "extract_dir",
+    type=click.Path(file_okay=False),
+    help="Write the bodies of the matching entries to this directory",
+)
+@click.option(
+    "--paths",
+    is_flag=True,
+    help="Use URL paths for extracted filenames instead of original names",
+)
+@click.option(
+    "--pretty-json",
+    is_flag=True,
+    help="Pretty print extracted JSON files with 2-space indentation",
+)
+def query(
+    database,
+    host,
+    url_pattern,
+    mime_types,
+    method,
+    status,
+    min_size,
+    max_size,
+    search,
+    where,
+    limit,
+    as_json,
+    extract_dir,
+    paths,
+    pretty_json,
+):
+    """Find entries in a HAR archive index built by the index command.
+
+    For example, all JSON responses over 1MB from api.* hosts:
+
+        extract_har.py query archive.db --mime application/json --min-size 1MB --host 'api.*'
+
+    Add -x DIR to extract the bodies of just those entries from the archive.
+    """
+    db = sqlite3.connect(database)
+    db.row_factory = sqlite3.Row
+    archive = db.execute("SELECT * FROM archive").fetchone()
+
+    conditions, params = [], []
+    if host:
+        conditions.append("host GLOB ?")
+        params.append(host.lower())
+    if url_pattern:
+        conditions.append("url GLOB ?")
+        params.append(url_pattern)
+    if mime_types:
+        conditions.append(
+            "(" + " OR ".join("mime_type GLOB ?" for _ in mime_types) + ")"
+        )
+        params.extend(mime_type.lower() for mime_type in mime_types)
+    if method:
+        conditions.append("method = ?")
+        params.append(method.upper())
+    if status:
+        conditions.append(f"status IN ({', '.join('?' * len(status))})")
+        params.extend(status)
+    if min_size is not None:
+        conditions.append("size >= ?")
+        params.append(min_size)
+    if max_size is not None:
+        conditions.append("size <= ?")
+        params.append(max_size)
+    if search:
+        if not archive["fts"]:
+            raise click.ClickException("--search needs an index built with --fts")
+        conditions.append(
+            "id IN (SELECT rowid FROM entries_fts WHERE entries_fts MATCH ?)"
+        )
+        params.append(search)
+    if where:
+        conditions.append(f"({where})")
+    sql = "SELECT * FROM entries"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY id"
+    if limit:
+        sql += f" LIMIT {limit}"
+
+    started = time.perf_counter()
+    try:
+        rows = db.execute(sql, params).fetchall()
+    except sqlite3.Error as e:
+        raise click.ClickException(f"Query failed: {e}")
+    elapsed = time.perf_counter() - started
+
+    for row in rows:
+        if as_json:
+            click.echo(json.dumps(dict(row)))
+        else:
+            click.echo(
+                f"{row['id']}\t{row['status']}\t{row['method']}\t"
+                f"{row['mime_type']}\t{row['size']}\t{row['url']}"
+            )
+    click.echo(f"{len(rows)} entries ({elapsed * 1000:.1f}ms)", err=True)
+
+    if extract_dir and rows:
+        extract_rows(archive, rows, Path(extract_dir), paths, pretty_json)
+
+
+def extract_rows(archive, rows, output_dir, paths, pretty_json):
+    """Write the bodies of indexed entries, reading only those from the archive."""
+    harzip = archive["path"]
+    try:
+        stat = os.stat(harzip)
+    except OSError:
+        raise click.ClickException(f"Archive {harzip} not found")
+    if (stat.st_size, stat.st_mtime_ns) != (archive["size"], archive["mtime_ns"]):
+        click.echo(f"Warning: {harzip} has changed since it was indexed", err=True)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    zf, raw, _ = open_har(harzip)
+    extractor = Extractor(zf, pretty_json)
+    try:
+        with raw:
+            for index, row in enumerate(rows):
+                content = read_entry_content(row, zf, raw)
+                outpath = output_path(
+                    output_dir,
+                    row["url"],
+                    row["mime_type"] or "",
+                    row["body_file"],
+                    paths,
+                )
+                extractor.extract(content, outpath, index)
+    finally:
+        if zf is not None:
+            zf.close()
 
 
 if __name__ == "__main__":
-    extract_har()
+    cli()
@@ -5,6 +5,16 @@ gguf_inspect.py  –  Dump ALL metadata key/value pairs from a GGUF file.
  • Default output: YAML (each value in a literal block scalar).
  • --json              Pretty-print JSON instead.
  • --exclude PREFIX    Skip keys that begin with PREFIX. May be repeated.
+ • --key KEY           Only output KEY. May be repeated.
+ • --array-limit N     Arrays longer than N (default 32) are shown as their
+                       length plus a preview; 0 shows them in full.
+ • --tensors           Analyse the tensor directory instead.
+
+Given a directory, a glob or several files it switches to batch mode and
+prints one JSON (or --csv) table summarising every GGUF file found.
+
+The file is memory-mapped and only the selected values are decoded, so
+inspecting a model with a 150,000 entry vocabulary stays fast.
 
 Example:
     ./gguf_dump_meta.py llama.gguf                            # YAML
@@ -13,11 +23,17 @@ Example:
 """
 
 import argparse
+import array
+import csv
+import glob
 import json
+import mmap
+import os
 import struct
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 # ──────────────────────────────────────────────────────
 # gguf helpers
@@ -40,66 +56,597 @@ _PRIM_SIZE = {k: struct.calcsize(v) for k, v in _PRIM_FMT.items()}
 
 STRING, ARRAY = 8, 9
 
+_U64 = struct.Struct("<Q")
+
+_TYPE_NAMES = {
+    0: "uint8",
+    1: "int8",
+    2: "uint16",
+    3: "int16",
+    4: "uint32",
+    5: "int32",
+    6: "float32",
+    7: "bool",
+    8: "string",
+    9: "array",
+    10: "uint64",
+    11: "int64",
+    12: "float64",
+}
 
-def _read(fmt: str, fh):
-    size = struct.calcsize(fmt)
-    data = fh.read(size)
-    if len(data) != size:
-        raise EOFError("unexpected EOF")
-    return struct.unpack("<" + fmt, data)
-
+# Arrays longer than this are summarised as length + preview by default
+DEFAULT_ARRAY_LIMIT = 32
+PREVIEW_ITEMS = 8
+
+DEFAULT_ALIGNMENT = 32
+
+# ggml tensor types: id -> (name, elements per block, bytes per block)
+GGML_TYPES = {
+    0: ("F32", 1, 4),
+    1: ("F16", 1, 2),
+    2: ("Q4_0", 32, 18),
+    3: ("Q4_1", 32, 20),
+    6: ("Q5_0", 32, 22),
+    7: ("Q5_1", 32, 24),
+    8: ("Q8_0", 32, 34),
+    9: ("Q8_1", 32, 36),
+    10: ("Q2_K", 256, 84),
+    11: ("Q3_K", 256, 110),
+    12: ("Q4_K", 256, 144),
+    13: ("Q5_K", 256, 176),
+    14: ("Q6_K", 256, 210),
+    15: ("Q8_K", 256, 292),
+    16: ("IQ2_XXS", 256, 66),
+    17: ("IQ2_XS", 256, 74),
+    18: ("IQ3_XXS", 256, 98),
+    19: ("IQ1_S", 256, 50),
+    20: ("IQ4_NL", 32, 18),
+    21: ("IQ3_S", 256, 110),
+    22: ("IQ2_S", 256, 82),
+    23: ("IQ4_XS", 256, 136),
+    24: ("I8", 1, 1),
+    25: ("I16", 1, 2),
+    26: ("I32", 1, 4),
+    27: ("I64", 1, 8),
+    28: ("F64", 1, 8),
+    29: ("IQ1_M", 256, 56),
+    30: ("BF16", 1, 2),
+    34: ("TQ1_0", 256, 54),
+    35: ("TQ2_0", 256, 66),
+    39: ("MXFP4", 32, 17),
+}
 
-def _read_string(fh) -> str:
-    (length,) = _read("Q", fh)
-    raw = fh.read(length)
-    if len(raw) != length:
-        raise EOFError("unexpected EOF in string")
-    return raw.decode("utf-8", errors="replace")
+# llama.cpp's general.file_type values
+FILE_TYPES = {
+    0: "F32",
+    1: "F16",
+    2: "Q4_0",
+    3: "Q4_1",
+    7: "Q8_0",
+    8: "Q5_0",
+    9: "Q5_1",
+    10: "Q2_K",
+    11: "Q3_K_S",
+    12: "Q3_K_M",
+    13: "Q3_K_L",
+    14: "Q4_K_S",
+    15: "Q4_K_M",
+    16: "Q5_K_S",
+    17: "Q5_K_M",
+    18: "Q6_K",
+    19: "IQ2_XXS",
+    20: "IQ2_XS",
+    21: "Q2_K_S",
+    22: "IQ3_XS",
+    23: "IQ3_XXS",
+    24: "IQ1_S",
+    25: "IQ4_NL",
+    26: "IQ3_S",
+    27: "IQ3_M",
+    28: "IQ2_S",
+    29: "IQ2_M",
+    30: "IQ4_XS",
+    31: "IQ1_M",
+    32: "BF16",
+    36: "TQ1_0",
+    37: "TQ2_0",
+    38: "MXFP4_MOE",
+}
 
 
-def _read_scalar(typ: int, fh):
-    (val,) = _read(_PRIM_FMT[typ], fh)
-    return bool(val) if typ == 7 else val
+class GGUFReader:
+    """
+    Lazy reader for the header of a memory-mapped GGUF file.
+
+    Opening only walks the key/value section to record where each value
+    starts - nothing is decoded until get() asks for it, and pages of the
+    file that are never looked at are never read from disk.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        with path.open("rb") as fh:
+            try:
+                self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # mmap refuses empty files
+                raise ValueError("not a GGUF file")
+        self._buf = memoryview(self._mm)
+        try:
+            if self._buf[:4] != b"GGUF":
+                raise ValueError("not a GGUF file")
+            (self.version,) = self._unpack("I", 4)
+            self.n_tensors, n_kv = self._unpack("QQ", 8)
+
+            # key -> (value type, offset of the value)
+            self.fields: Dict[str, Tuple[int, int]] = {}
+            pos = 24
+            for _ in range(n_kv):
+                key, pos = self._read_string(pos)
+                (val_type,) = self._unpack("I", pos)
+                pos += 4
+                self.fields[key] = (val_type, pos)
+                pos = self._skip(val_type, pos)
+        except BaseException:
+            # Nobody gets a reader to close, so unmap the file here
+            self.close()
+            raise
+        # The tensor info table starts here
+        self.kv_end = pos
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        self._buf.release()
+        try:
+            self._mm.close()
+        except BufferError:
+            # Zero-copy arrays handed out by get() are still alive; the
+            # mapping goes away when they do
+            pass
+
+    def _unpack(self, fmt: str, pos: int) -> tuple:
+        try:
+            return struct.unpack_from("<" + fmt, self._buf, pos)
+        except struct.error:
+            raise EOFError("unexpected EOF")
+
+    def _read_string(self, pos: int) -> Tuple[str, int]:
+        (length,) = self._unpack("Q", pos)
+        pos += 8
+        if pos + length > len(self._buf):
+            raise EOFError("unexpected EOF in string")
+        raw = self._buf[pos : pos + length]
+        return str(raw, "utf-8", errors="replace"), pos + length
+
+    def _skip(self, val_type: int, pos: int) -> int:
+        """Return the offset just past a value, without decoding it."""
+        if val_type == STRING:
+            (length,) = self._unpack("Q", pos)
+            end = pos + 8 + length
+        elif val_type == ARRAY:
+            elem_type, count = self._unpack("IQ", pos)
+            pos += 12
+            if elem_type in _PRIM_SIZE:
+                end = pos + _PRIM_SIZE[elem_type] * count
+            elif elem_type == STRING:
+                # The hot loop for tokenizer vocabularies: just hop from one
+                # length prefix to the next
+                unpack_length = _U64.unpack_from
+                buf = self._buf
+                try:
+                    for _ in range(count):
+                        pos += 8 + unpack_length(buf, pos)[0]
+                except struct.error:
+                    raise EOFError("unexpected EOF in array")
+                end = pos
+            else:
+                # Nested arrays have to be stepped over one by one
+                for _ in range(count):
+                    pos = self._skip(elem_type, pos)
+                end = pos
+        elif val_type in _PRIM_SIZE:
+            end = pos + _PRIM_SIZE[val_type]
+        else:
+            raise ValueError(f"unknown GGUF value type {val_type}")
+        if end > len(self._buf):
+            raise EOFError("unexpected EOF")
+        return end
+
+    def _read_value(self, val_type: int, pos: int, limit: Optional[int]) -> Any:
+        if val_type == STRING:
+            return self._read_string(pos)[0]
+        if val_type == ARRAY:
+            return self._read_array(pos, limit)
+        (val,) = self._unpack(_PRIM_FMT[val_type], pos)
+        return bool(val) if val_type == 7 else val
+
+    def _read_array(self, pos: int, limit: Optional[int]) -> Any:
+        elem_type, count = self._unpack("IQ", pos)
+        pos += 12
+        if limit is not None and count > limit:
+            return {
+                "type": f"array[{_TYPE_NAMES.get(elem_type, elem_type)}]",
+                "length": count,
+                "preview": to_jsonable(self._array_items(elem_type, PREVIEW_ITEMS, pos)),
+            }
+        return self._array_items(elem_type, count, pos)
+
+    def _array_items(self, elem_type: int, count: int, pos: int) -> Any:
+        if elem_type in _PRIM_SIZE:
+            view = self._buf[pos : pos + _PRIM_SIZE[elem_type] * count]
+            if elem_type == 7:
+                return view.cast("?")
+            if sys.byteorder == "little" or _PRIM_SIZE[elem_type] == 1:
+                # Zero-copy: a typed view straight onto the mapped file
+                return view.cast(_PRIM_FMT[elem_type])
+            values = array.array(_PRIM_FMT[elem_type], view)
+            values.byteswap()
+            return values
+        items = []
+        for _ in range(count):
+            items.append(self._read_value(elem_type, pos, None))
+            pos = self._skip(elem_type, pos)
+        return items
+
+    def tensor_infos(self) -> List[Dict[str, Any]]:
+        """
+        Parse the tensor info table that follows the key/value section.
+
+        Sizes are worked out from each tensor's shape and ggml type - the
+        tensor data itself is never touched.
+        """
+        tensors = []
+        pos = self.kv_end
+        for _ in range(self.n_tensors):
+            name, pos = self._read_string(pos)
+            (n_dims,) = self._unpack("I", pos)
+            shape = list(self._unpack(f"{n_dims}Q", pos + 4))
+            pos += 4 + 8 * n_dims
+            ggml_type, offset = self._unpack("IQ", pos)
+            pos += 12
+            parameters = 1
+            for dim in shape:
+                parameters *= dim
+            type_name, block_size, block_bytes = GGML_TYPES.get(
+                ggml_type, (f"type_{ggml_type}", None, None)
+            )
+            tensors.append(
+                {
+                    "name": name,
+                    "type": type_name,
+                    "shape": shape,
+                    "parameters": parameters,
+                    "bytes": (
+                        parameters // block_size * block_bytes if block_size else None
+                    ),
+                    "offset": offset,
+                }
+            )
+        self.tensor_info_end = pos
+        return tensors
+
+    def get(self, key: str, array_limit: Optional[int] = None) -> Any:
+        """
+        Decode the value for key. Numeric arrays come back as memoryview (or
+        array.array) objects; arrays longer than array_limit are summarised
+        as a dict of type, length and a short preview.
+        """
+        val_type, pos = self.fields[key]
+        return self._read_value(val_type, pos, array_limit)
+
+
+def to_jsonable(value: Any) -> Any:
+    if isinstance(value, (memoryview, array.array)):
+        return value.tolist()
+    if isinstance(value, list):
+        return [to_jsonable(v) for v in value]
+    return value
+
+
+def extract_metadata(
+    path: Path,
+    keys: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+    array_limit: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Decode metadata from path into plain Python values. Only keys that are
+    selected (all of them, by default) and not excluded are decoded at all.
+    """
+    meta: Dict[str, Any] = {}
+    with GGUFReader(path) as reader:
+        for key in reader.fields:
+            if keys is not None and key not in keys:
+                continue
+            if exclude and not should_include(key, exclude):
+                continue
+            meta[key] = to_jsonable(reader.get(key, array_limit))
+    return meta
 
 
-def _read_array(elem_type: int, count: int, fh) -> List[Any]:
-    if elem_type == STRING:
-        return [_read_string(fh) for _ in range(count)]
+def tensor_group(name: str) -> str:
+    """blk.12.attn_q.weight -> blk.12, token_embd.weight -> token_embd"""
+    parts = name.split(".")
+    if parts[0] == "blk" and len(parts) > 2:
+        return ".".join(parts[:2])
+    return parts[0]
+
+
+def kv_cache_bytes(reader: GGUFReader) -> Optional[int]:
+    """
+    Estimate the f16 KV cache for a full context window from the
+    architecture's hyperparameters, or None if any are missing.
+    """
+    fields = reader.fields
+    arch = reader.get("general.architecture") if "general.architecture" in fields else None
+    keys = {
+        name: f"{arch}.{name}"
+        for name in (
+            "block_count",
+            "context_length",
+            "embedding_length",
+            "attention.head_count",
+            "attention.head_count_kv",
+            "attention.key_length",
+            "attention.value_length",
+        )
+    }
+    values = {name: reader.get(key) for name, key in keys.items() if key in fields}
+    try:
+        blocks = values["block_count"]
+        context = values["context_length"]
+        heads = values["attention.head_count"]
+        kv_heads = values.get("attention.head_count_kv", heads)
+        head_dim = values["embedding_length"] // heads
+    except (KeyError, TypeError, ZeroDivisionError):
+        return None
+    if not isinstance(kv_heads, int):
+        # Per-layer head counts - use the largest
+        kv_heads = max(to_jsonable(kv_heads))
+    key_length = values.get("attention.key_length", head_dim)
+    value_length = values.get("attention.value_length", head_dim)
+    return blocks * context * kv_heads * (key_length + value_length) * 2
+
+
+def analyze_tensors(path: Path, list_tensors: bool = False) -> Dict[str, Any]:
+    """
+    Summarise the tensor directory: bytes and parameters per layer and per
+    quantization type, plus totals and an estimate of memory use at load.
+    """
+    with GGUFReader(path) as reader:
+        tensors = reader.tensor_infos()
+        alignment = DEFAULT_ALIGNMENT
+        if "general.alignment" in reader.fields:
+            alignment = reader.get("general.alignment") or DEFAULT_ALIGNMENT
+        data_start = -(-reader.tensor_info_end // alignment) * alignment
+        kv_cache = kv_cache_bytes(reader)
+
+    by_type: Dict[str, Dict[str, int]] = {}
+    by_layer: Dict[str, Dict[str, int]] = {}
+    total_parameters = total_bytes = 0
+    unknown = []
+    file_size = path.stat().st_size
+    beyond_end = []
+    for tensor in tensors:
+        size = tensor["bytes"]
+        if size is None:
+            unknown.append(tensor["name"])
+            size = 0
+        elif data_start + tensor["offset"] + size > file_size:
+            beyond_end.append(tensor["name"])
+        total_parameters += tensor["parameters"]
+        total_bytes += size
+        for table, key in (
+            (by_type, tensor["type"]),
+            (by_layer, tensor_group(tensor["name"])),
+        ):
+            entry = table.setdefault(key, {"tensors": 0, "parameters": 0, "bytes": 0})
+            entry["tensors"] += 1
+            entry["parameters"] += tensor["parameters"]
+            entry["bytes"] += size
+
+    for entry in by_type.values():
+        entry["bits_per_weight"] = (
+            round(entry["bytes"] * 8 / entry["parameters"], 2)
+            if entry["parameters"]
+            else 0
+        )
+
+    analysis: Dict[str, Any] = {
+        "tensor_count": len(tensors),
+        "parameters": total_parameters,
+        "tensor_bytes": total_bytes,
+        "bits_per_weight": (
+            round(total_bytes * 8 / total_parameters, 2) if total_parameters else 0
+        ),
+        "by_type": dict(
+            sorted(by_type.items(), key=lambda item: item[1]["bytes"], reverse=True)
+        ),
+        "by_layer": by_layer,
+        "estimated_memory": {
+            "weights": total_bytes,
+            "kv_cache_f16_full_context": kv_cache,
+            "total": total_bytes + (kv_cache or 0),
+        },
+    }
+    if unknown:
+        analysis["unknown_type_tensors"] = unknown
+    if beyond_end:
+        analysis["tensors_beyond_end_of_file"] = beyond_end
+    if list_tensors:
+        analysis["tensors"] = tensors
+    return analysis
 
-    elem_size = _PRIM_SIZE[elem_type]
-    data = fh.read(elem_size * count)
-    if len(data) != elem_size * count:
-        raise EOFError("unexpected EOF in array")
-    fmt = f"<{count}{_PRIM_FMT[elem_type]}"
-    out = list(struct.unpack(fmt, data))
-    if elem_type == 7:
-        out = [bool(v) for v in out]
-    return out
 
+# ──────────────────────────────────────────────────────
+# Batch mode
+# ──────────────────────────────────────────────────────
 
-def extract_metadata(path: Path) -> Dict[str, Any]:
-    meta: Dict[str, Any] = {}
+BATCH_COLUMNS = [
+    "path",
+    "size",
+    "architecture",
+    "name",
+    "quantization",
+    "parameters",
+    "context_length",
+    "block_count",
+]
+
+
+def default_cache_path() -> Path:
+    """Where batch summaries are cached between runs."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "gguf-inspect" / "summaries.json"
+
+
+def load_cache(cache_path: Optional[Path]) -> Dict[str, Any]:
+    """Load the {path: [size, mtime_ns, summary]} cache, or an empty one."""
+    if cache_path is None:
+        return {}
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache_path: Optional[Path], cache: Dict[str, Any]) -> None:
+    """Atomically write the cache, ignoring failures."""
+    if cache_path is None:
+        return
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+def find_files(targets: List[str]) -> List[Path]:
+    """Expand directories (recursively) and globs into a sorted list of files."""
+    found = set()
+    for target in targets:
+        if os.path.isdir(target):
+            for root, _dirs, files in os.walk(target):
+                found.update(os.path.join(root, name) for name in files)
+        elif os.path.isfile(target):
+            found.add(target)
+        else:
+            found.update(p for p in glob.glob(target, recursive=True) if os.path.isfile(p))
+    return [Path(p).resolve() for p in sorted(found)]
+
+
+def summarize_model(path: Path, keys: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Summarise one file's header, or return None if it is not GGUF - model
+    caches like Ollama's store GGUF files without a .gguf extension.
+    """
     with path.open("rb") as fh:
         if fh.read(4) != b"GGUF":
-            raise ValueError("not a GGUF file")
-        (_version,) = _read("I", fh)
-        _ntensors, n_kv = _read("QQ", fh)
-
-        for _ in range(n_kv):
-            key = _read_string(fh)
-            (val_type,) = _read("I", fh)
-
-            if val_type == STRING:
-                value = _read_string(fh)
-            elif val_type == ARRAY:
-                (elem_type,) = _read("I", fh)
-                (count,) = _read("Q", fh)
-                value = _read_array(elem_type, count, fh)
-            else:
-                value = _read_scalar(val_type, fh)
-
-            meta[key] = value
-    return meta
+            return None
+    with GGUFReader(path) as reader:
+
+        def value(key: str) -> Any:
+            if key not in reader.fields:
+                return None
+            return to_jsonable(reader.get(key, DEFAULT_ARRAY_LIMIT))
+
+        arch = value("general.architecture")
+        file_type = value("general.file_type")
+        summary = {
+            "architecture": arch,
+            "name": value("general.name"),
+            "quantization": FILE_TYPES.get(file_type, file_type),
+            "parameters": sum(t["parameters"] for t in reader.tensor_infos()),
+            "context_length": value(f"{arch}.context_length"),
+            "block_count": value(f"{arch}.block_count"),
+        }
+        for key in keys:
+            summary[key] = value(key)
+    return summary
+
+
+def batch_worker(job) -> Tuple[str, Any, Optional[str]]:
+    path, keys = job
+    try:
+        return str(path), summarize_model(path, keys), None
+    except (OSError, ValueError, EOFError) as e:
+        return str(path), None, str(e)
+
+
+def inspect_batch(
+    targets: List[str],
+    keys: List[str],
+    cache_path: Optional[Path],
+    jobs: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Summarise every GGUF file in targets, in parallel. Results are cached
+    by (path, size, mtime) so unchanged files are never opened again.
+    """
+    cache = load_cache(cache_path)
+    summaries: Dict[str, Any] = {}
+    stats: Dict[str, os.stat_result] = {}
+    todo = []
+    for path in find_files(targets):
+        key = str(path)
+        st = stats[key] = path.stat()
+        cached = cache.get(key)
+        if (
+            cached
+            and cached[:2] == [st.st_size, st.st_mtime_ns]
+            and (cached[2] is None or all(k in cached[2] for k in keys))
+        ):
+            summaries[key] = cached[2]
+        else:
+            todo.append((path, keys))
+
+    if todo:
+        if len(todo) == 1 or jobs == 1:
+            results = list(map(batch_worker, todo))
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(batch_worker, todo))
+        for key, summary, error in results:
+            if error:
+                print(f"{key}: {error}", file=sys.stderr)
+                continue
+            st = stats[key]
+            summaries[key] = summary
+            cache[key] = [st.st_size, st.st_mtime_ns, summary]
+        # Forget files that have gone away
+        for key in [k for k in cache if not os.path.exists(k)]:
+            del cache[key]
+        save_cache(cache_path, cache)
+
+    rows = []
+    for key, summary in summaries.items():
+        if summary is None:
+            continue
+        rows.append({"path": key, "size": stats[key].st_size, **summary})
+    rows.sort(key=lambda row: row["path"])
+    return rows
+
+
+def dump_csv(rows: List[Dict[str, Any]], columns: List[str]) -> None:
+    writer = csv.DictWriter(sys.stdout, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(
+            {
+                k: json.dumps(v) if isinstance(v, (list, dict)) else v
+                for k, v in row.items()
+            }
+        )
 
 
 # ──────────────────────────────────────────────────────
@@ -141,8 +688,72 @@ def parse_args():
         metavar="PREFIX",
         help="exclude keys that start with PREFIX (can be given multiple times)",
     )
-    p.add_argument("gguf", metavar="MODEL.GGUF", help="path to GGUF file")
-    return p.parse_args()
+    p.add_argument(
+        "--key",
+        action="append",
+        dest="keys",
+        metavar="KEY",
+        help="only output this key (can be given multiple times)",
+    )
+    p.add_argument(
+        "--array-limit",
+        type=int,
+        default=None,
+        metavar="N",
+        help="summarise arrays longer than N as length + preview "
+        f"(default {DEFAULT_ARRAY_LIMIT}, 0 for no limit)",
+    )
+    p.add_argument(
+        "--tensors",
+        action="store_true",
+        help="analyse the tensor directory instead of dumping metadata",
+    )
+    p.add_argument(
+        "--list-tensors",
+        action="store_true",
+        help="with --tensors, also list every tensor",
+    )
+    p.add_argument(
+        "--csv",
+        action="store_true",
+        help="batch mode: output the summary table as CSV instead of JSON",
+    )
+    p.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="batch mode: number of worker processes (default: one per CPU)",
+    )
+    p.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="batch mode: ignore and don't update the summary cache",
+    )
+    p.add_argument(
+        "gguf",
+        metavar="MODEL.GGUF",
+        nargs="+",
+        help="path to GGUF file - or a directory, glob or several files for batch mode",
+    )
+    args = p.parse_args()
+    args.batch = len(args.gguf) > 1 or not os.path.isfile(args.gguf[0])
+    if args.batch:
+        unsupported = [
+            flag
+            for flag, value in (
+                ("--tensors", args.tensors),
+                ("--list-tensors", args.list_tensors),
+                ("--exclude", args.exclude),
+                ("--array-limit", args.array_limit is not None),
+            )
+            if value
+        ]
+        if unsupported:
+            p.error(f"{', '.join(unsupported)} cannot be used in batch mode")
+    elif args.array_limit is None:
+        args.array_limit = DEFAULT_ARRAY_LIMIT
+    return args
 
 
 def should_include(key: str, prefixes: List[str]) -> bool:
@@ -152,13 +763,35 @@ def should_include(key: str, prefixes: List[str]) -> bool:
 def main():
     args = parse_args()
 
-    path = Path(args.gguf)
-    if not path.is_file():
-        sys.exit(f"File not found: {path}")
-
-    meta = extract_metadata(path)
-    if args.exclude:
-        meta = {k: v for k, v in meta.items() if should_include(k, args.exclude)}
+    if args.batch:
+        target = args.gguf[0]
+        is_glob = any(c in target for c in "*?[")
+        if len(args.gguf) == 1 and not is_glob and not os.path.isdir(target):
+            sys.exit(f"File not found: {target}")
+        keys = args.keys or []
+        rows = inspect_batch(
+            args.gguf,
+            keys,
+            cache_path=None if args.no_cache else default_cache_path(),
+            jobs=args.jobs,
+        )
+        if args.csv:
+            dump_csv(rows, BATCH_COLUMNS + [k for k in keys if k not in BATCH_COLUMNS])
+        else:
+            dump_json(rows)
+        return
+
+    path = Path(args.gguf[0])
+
+    if args.tensors or args.list_tensors:
+        meta = analyze_tensors(path, list_tensors=args.list_tensors)
+    else:
+        meta = extract_metadata(
+            path,
+            keys=args.keys,
+            exclude=args.exclude,
+            array_limit=args.array_limit or None,
+        )
 
     if args.json:
         dump_json(meta)
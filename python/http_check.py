@@ -1,14 +1,58 @@
 #!/usr/bin/env python3
 
 import argparse
+import csv
+import gzip
+import http.client
+import json
+import re
+import ssl
 import sys
+import threading
+import time
 import urllib.request
 import urllib.parse
 import urllib.error
+import xml.etree.ElementTree as ET
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from http.client import HTTPMessage  # For type hinting response.info()
+from typing import Dict, Iterator, List, NamedTuple, Tuple
 
 # --- Configuration ---
 USER_AGENT = "Python-StdLib-HeaderCheck/1.1"  # Version bump
+BATCH_TIMEOUT = 15
+# Errors that mean an idle keep-alive connection was closed by the server
+# and the request should be retried on a fresh one
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+MAX_AGE = re.compile(r"(?:^|,)\s*(?:s-)?max-age\s*=\s*\"?(\d+)", re.IGNORECASE)
+REPORT_COLUMNS = [
+    "url",
+    "status",
+    "ttfb_ms",
+    "total_ms",
+    "transfer_bytes",
+    "uncompressed_bytes",
+    "content_encoding",
+    "gzip_ratio",
+    "br_bytes",
+    "br_ratio",
+    "etag",
+    "etag_304",
+    "last_modified",
+    "last_modified_304",
+    "cache_control",
+    "max_age",
+    "expires",
+    "vary",
+    "location",
+    "error",
+]
 
 
 def check_url_features(url: str):
@@ -212,16 +256,313 @@ def check_url_features(url: str):
     print("-------------\n")
 
 
+class Fetched(NamedTuple):
+    status: int
+    headers: HTTPMessage
+    body: bytes
+    ttfb: float
+    elapsed: float
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP(S) connections shared between threads, one idle list per
+    host, so every request to a host after the first skips the TCP and TLS
+    handshakes.
+    """
+
+    def __init__(self, timeout: float = BATCH_TIMEOUT):
+        self.timeout = timeout
+        self.ssl_context = ssl.create_default_context()
+        self._idle: Dict[Tuple[str, str], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def _acquire(self, key: Tuple[str, str]) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        scheme, netloc = key
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(
+                netloc, timeout=self.timeout, context=self.ssl_context
+            )
+        else:
+            conn = http.client.HTTPConnection(netloc, timeout=self.timeout)
+        return conn, False
+
+    def _release(self, key: Tuple[str, str], conn: http.client.HTTPConnection):
+        with self._lock:
+            self._idle.setdefault(key, []).append(conn)
+
+    def get(self, url: str, headers: Dict[str, str]) -> Fetched:
+        """GET a URL, without following redirects, timing the response."""
+        parsed = urllib.parse.urlsplit(url)
+        key = (parsed.scheme, parsed.netloc)
+        # http.client only sends ASCII, so percent-encode anything else
+        # while leaving existing %XX escapes and reserved characters alone
+        target = urllib.parse.urlunsplit(
+            (
+                "",
+                "",
+                urllib.parse.quote(parsed.path or "/", safe="/%:@!$&'()*+,;=~"),
+                urllib.parse.quote(parsed.query, safe="/?%:@!$&'()*+,;=~"),
+                "",
+            )
+        )
+        headers = {"User-Agent": USER_AGENT, **headers}
+        while True:
+            conn, reused = self._acquire(key)
+            try:
+                started = time.perf_counter()
+                conn.request("GET", target, headers=headers)
+                response = conn.getresponse()
+                ttfb = time.perf_counter() - started
+                body = response.read()
+                elapsed = time.perf_counter() - started
+            except STALE_CONNECTION_ERRORS:
+                conn.close()
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(key, conn)
+            return Fetched(response.status, response.headers, body, ttfb, elapsed)
+
+    def close(self):
+        with self._lock:
+            for idle in self._idle.values():
+                for conn in idle:
+                    conn.close()
+            self._idle.clear()
+
+
+def milliseconds(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+def audit_url(pool: ConnectionPool, url: str) -> Dict:
+    """
+    Check a URL's caching behaviour over pooled connections.
+
+    Makes a gzip GET, then - if that returned 200 - a Brotli GET and
+    conditional GETs with the ETag and Last-Modified values it sent back.
+    Returns a dictionary with a value (or None) for each of REPORT_COLUMNS.
+    """
+    record = dict.fromkeys(REPORT_COLUMNS)
+    record["url"] = url
+    try:
+        first = pool.get(url, {"Accept-Encoding": "gzip"})
+        headers = first.headers
+        record.update(
+            status=first.status,
+            ttfb_ms=milliseconds(first.ttfb),
+            total_ms=milliseconds(first.elapsed),
+            transfer_bytes=len(first.body),
+            content_encoding=headers.get("Content-Encoding"),
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+            cache_control=headers.get("Cache-Control"),
+            expires=headers.get("Expires"),
+            vary=headers.get("Vary"),
+            location=headers.get("Location"),
+        )
+        if record["cache_control"]:
+            match = MAX_AGE.search(record["cache_control"])
+            if match:
+                record["max_age"] = int(match.group(1))
+        if first.status != 200:
+            return record
+
+        encoding = (record["content_encoding"] or "").strip().lower()
+        if encoding == "gzip":
+            try:
+                # wbits=47 accepts both gzip and zlib framing
+                uncompressed = len(zlib.decompress(first.body, 47))
+            except zlib.error:
+                uncompressed = None
+            record["uncompressed_bytes"] = uncompressed
+            if uncompressed and first.body:
+                record["gzip_ratio"] = round(uncompressed / len(first.body), 2)
+        elif encoding in ("", "identity"):
+            record["uncompressed_bytes"] = len(first.body)
+
+        brotli = pool.get(url, {"Accept-Encoding": "br"})
+        if brotli.headers.get("Content-Encoding", "").strip().lower() == "br":
+            record["br_bytes"] = len(brotli.body)
+            if record["uncompressed_bytes"] and brotli.body:
+                record["br_ratio"] = round(
+                    record["uncompressed_bytes"] / len(brotli.body), 2
+                )
+
+        if record["etag"]:
+            conditional = pool.get(
+                url, {"Accept-Encoding": "gzip", "If-None-Match": record["etag"]}
+            )
+            record["etag_304"] = conditional.status == 304
+        if record["last_modified"]:
+            conditional = pool.get(
+                url,
+                {
+                    "Accept-Encoding": "gzip",
+                    "If-Modified-Since": record["last_modified"],
+                },
+            )
+            record["last_modified_304"] = conditional.status == 304
+    except Exception as e:
+        # Record the failure for this URL rather than abandoning the batch
+        record["error"] = str(e) or type(e).__name__
+    return record
+
+
+def read_url_list(path: str) -> List[str]:
+    """Read one URL per line from a file ('-' for stdin), skipping # comments."""
+    f = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    with f:
+        return [
+            line.strip()
+            for line in f
+            if line.strip() and not line.lstrip().startswith("#")
+        ]
+
+
+def read_sitemap(source: str, depth: int = 0) -> Iterator[str]:
+    """
+    Yield the page URLs in a sitemap.xml - a URL or a local file, optionally
+    gzipped - following sitemap index files to the sitemaps they list.
+    """
+    if urllib.parse.urlparse(source).scheme in ("http", "https"):
+        request = urllib.request.Request(source, headers={"User-Agent": USER_AGENT})
+        with urllib.request.urlopen(request, timeout=BATCH_TIMEOUT) as response:
+            data = response.read()
+    else:
+        with open(source, "rb") as f:
+            data = f.read()
+    if data[:2] == b"\x1f\x8b":
+        data = gzip.decompress(data)
+    root = ET.fromstring(data)
+    for element in root.iter():
+        if not element.tag.endswith("}loc") and element.tag != "loc":
+            continue
+        loc = (element.text or "").strip()
+        if not loc:
+            continue
+        # Entries in a <sitemapindex> are themselves sitemaps
+        if root.tag.endswith("sitemapindex") and depth < 3:
+            yield from read_sitemap(loc, depth + 1)
+        else:
+            yield loc
+
+
+def audit_urls(urls: List[str], concurrency: int) -> List[Dict]:
+    """Audit URLs concurrently, returning their records in the same order."""
+    pool = ConnectionPool()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(lambda url: audit_url(pool, url), urls))
+    finally:
+        pool.close()
+
+
+def write_report(records: List[Dict], fmt: str, output) -> None:
+    if fmt == "csv":
+        writer = csv.DictWriter(output, fieldnames=REPORT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(records)
+    else:
+        json.dump(records, output, indent=2)
+        output.write("\n")
+
+
+def run_batch(args) -> None:
+    """Collect the URLs for --urls and --sitemap, audit them and write the report."""
+    urls = []
+    try:
+        if args.urls:
+            urls.extend(read_url_list(args.urls))
+        if args.sitemap:
+            urls.extend(read_sitemap(args.sitemap))
+    except (OSError, ET.ParseError, urllib.error.URLError) as e:
+        print(f"[!] Could not read URL list: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    checked = []
+    for url in dict.fromkeys(urls):
+        try:
+            parsed_url = urllib.parse.urlparse(url)
+        except ValueError as e:
+            print(f"[!] Skipping '{url}': {e}", file=sys.stderr)
+            continue
+        if parsed_url.scheme in ("http", "https") and parsed_url.netloc:
+            checked.append(url)
+        else:
+            print(f"[!] Skipping '{url}': not an http(s) URL", file=sys.stderr)
+    if not checked:
+        print("[!] No URLs to check", file=sys.stderr)
+        sys.exit(1)
+
+    started = time.perf_counter()
+    records = audit_urls(checked, max(1, args.concurrency))
+    elapsed = time.perf_counter() - started
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as output:
+            write_report(records, args.format, output)
+    else:
+        write_report(records, args.format, sys.stdout)
+
+    errors = sum(1 for record in records if record["error"])
+    print(
+        f"[*] Checked {len(records)} URLs in {elapsed:.1f}s ({errors} errors)",
+        file=sys.stderr,
+    )
+
+
 def main():
     """Parses arguments and runs the check."""
     parser = argparse.ArgumentParser(
         description="Check a URL for Gzip, ETag, and Last-Modified support using only Python's standard library.",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
     )
-    parser.add_argument("url", help="The URL to test (e.g., https://www.example.com)")
+    parser.add_argument(
+        "url", nargs="?", help="The URL to test (e.g., https://www.example.com)"
+    )
+    batch = parser.add_argument_group(
+        "batch mode", "Check many URLs concurrently and output a JSON or CSV report"
+    )
+    batch.add_argument(
+        "--urls", metavar="FILE", help="File with one URL per line ('-' for stdin)"
+    )
+    batch.add_argument(
+        "--sitemap",
+        metavar="SOURCE",
+        help="URL or path of a sitemap.xml (or sitemap index) to check every page of",
+    )
+    batch.add_argument(
+        "-c", "--concurrency", type=int, default=8, help="URLs to check at once"
+    )
+    batch.add_argument(
+        "--format", choices=("json", "csv"), default="json", help="Report format"
+    )
+    batch.add_argument(
+        "-o", "--output", help="Write the report to this file instead of stdout"
+    )
 
     args = parser.parse_args()
 
+    if args.urls or args.sitemap:
+        if args.url:
+            parser.error("pass either a URL or --urls/--sitemap, not both")
+        run_batch(args)
+        return
+    if not args.url:
+        parser.error("a URL, --urls or --sitemap is required")
+
     # Basic URL validation and scheme addition
     parsed_url = urllib.parse.urlparse(args.url)
     if not parsed_url.scheme:
@@ -1,93 +1,128 @@
 #!/usr/bin/env python3
+import argparse
+import io
 import json
+import re
 import sys
-import argparse
+
+# Text is read this many characters at a time, so memory use is bounded by
+# the chunk size plus the largest JSON value in the input. Kept small because
+# every failed raw_decode() counts the newlines before the failure position
+# in order to report a line number.
+CHUNK_SIZE = 1 << 16
+# Give up on a single candidate value once it grows past this many characters.
+MAX_VALUE_SIZE = 256 << 20
+# A decode error this close to the end of the buffer might just mean the
+# value continues in the next chunk.
+TRUNCATION_WINDOW = 16
+
+# Only a "{" or "[" followed by something that could continue a JSON value
+# is worth trying, which rules out most prose like "{name}" or "[link]".
+OPENERS = re.compile(r'\{\s*["}]|\[\s*[-\[{"\]0-9tfn]|[{\[]\s*$')
+decoder = json.JSONDecoder()
+
+
+def might_be_truncated(exc, buffer_length):
+    return buffer_length - exc.pos < TRUNCATION_WINDOW or exc.msg.startswith(
+        "Unterminated string"
+    )
 
 
-def extract_json_objects(text):
+class PushbackReader:
+    """Read from a text stream, returning any pushed-back text first."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.pushed = []
+
+    def push(self, text):
+        if text:
+            self.pushed.append(io.StringIO(text))
+
+    def read(self, size):
+        while self.pushed:
+            data = self.pushed[-1].read(size)
+            if data:
+                return data
+            self.pushed.pop()
+        return self.stream.read(size)
+
+
+def iter_json_values(stream, chunk_size=CHUNK_SIZE, max_size=MAX_VALUE_SIZE):
     """
-    Extract all valid JSON objects from text using a state machine parser.
+    Yield (value, length) for every JSON object or array found in a text stream.
 
-    Returns a list of valid JSON objects as Python dictionaries.
+    Each "{" or "[" is handed to json.JSONDecoder.raw_decode(), and scanning
+    resumes after the end of any value it decodes, so nested values are not
+    reported separately. length is the number of characters the value spans
+    in the input. Empty arrays - "[ ]" Markdown checkboxes, for example - are
+    skipped.
     """
-    result = []
-    i = 0
-    text_length = len(text)
-
-    while i < text_length:
-        # Look for the start of a potential JSON object
-        if text[i] == "{":
-            # Try to parse a complete JSON object starting at this position
-            potential_json, end_pos = parse_json_object(text, i)
-            if potential_json is not None:
-                try:
-                    # Directly parse without fixing - invalid JSON will be rejected
-                    parsed_obj = json.loads(potential_json)
-                    result.append(parsed_obj)
-                except json.JSONDecodeError:
-                    pass
-                # Skip to the end of this object to avoid finding nested objects
-                i = end_pos
+    reader = PushbackReader(stream)
+    buffer = ""
+    pos = 0
+    eof = False
+    while True:
+        if pos and len(buffer) > 2 * chunk_size:
+            # The buffer grew to hold a large candidate. Hand the unscanned
+            # rest back to be read a chunk at a time, so failed decodes of
+            # later candidates never count newlines across megabytes
+            reader.push(buffer[pos:])
+            buffer = ""
+            pos = 0
+        match = OPENERS.search(buffer, pos)
+        if match is None:
+            if eof:
+                return
+            # Nothing left in this buffer could start a value
+            buffer = reader.read(chunk_size)
+            pos = 0
+            eof = not buffer
+            continue
+
+        start = match.start()
+        try:
+            value, end = decoder.raw_decode(buffer, start)
+        except json.JSONDecodeError as exc:
+            if (
+                not eof
+                and len(buffer) - start < max_size
+                and might_be_truncated(exc, len(buffer))
+            ):
+                # Read more and try again, at least doubling what is held so
+                # a large value costs linear rather than quadratic time
+                more = reader.read(max(chunk_size, len(buffer) - start))
+                eof = not more
+                buffer = buffer[start:] + more
+                pos = 0
             else:
-                i += 1
-        else:
-            i += 1
+                pos = start + 1
+            continue
 
-    return result
+        pos = end
+        if isinstance(value, list) and not value:
+            continue
+        yield value, end - start
 
 
-def parse_json_object(text, start_pos):
+def extract_json_objects(text):
     """
-    Parse a JSON object starting at start_pos.
+    Extract all valid JSON objects and arrays from text.
 
-    Returns (json_string, end_position) if successful, or (None, start_pos) if not.
+    Returns a list of the decoded values.
     """
-    i = start_pos
-    if i >= len(text) or text[i] != "{":
-        return None, start_pos
-
-    # State variables
-    brace_count = 1  # We already found the first '{'
-    in_string = False
-    escape_next = False
-
-    # Start accumulating the JSON string
-    json_str = text[i]
-    i += 1
-
-    while i < len(text) and brace_count > 0:
-        char = text[i]
-        json_str += char
-
-        # Handle string state
-        if in_string:
-            if escape_next:
-                escape_next = False
-            elif char == "\\":
-                escape_next = True
-            elif char == '"':
-                in_string = False
-        else:
-            # Only count braces outside of strings
-            if char == '"':
-                in_string = True
-            elif char == "{":
-                brace_count += 1
-            elif char == "}":
-                brace_count -= 1
-                # If we've closed all braces, we have a potential complete JSON object
-                if brace_count == 0:
-                    return json_str, i + 1
-
-        i += 1
-
-    # If we got here, we didn't find a complete JSON object
-    return None, start_pos
+    return [value for value, _ in iter_json_values(io.StringIO(text))]
+
+
+def indent_lines(text, prefix="  "):
+    return "\n".join(prefix + line for line in text.split("\n"))
 
 
 def main():
     # Parse command line arguments
-    parser = argparse.ArgumentParser(description="Extract JSON objects from text.")
+    parser = argparse.ArgumentParser(
+        description="Extract JSON objects and arrays from text."
+    )
     parser.add_argument(
         "file",
         nargs="?",
@@ -95,42 +130,56 @@ def main():
         default=None,
         help="File to read (defaults to stdin)",
     )
-    parser.add_argument(
+    output_mode = parser.add_mutually_exclusive_group()
+    output_mode.add_argument(
         "--all",
         "-a",
         action="store_true",
         help="Output all JSON objects found, not just the best one",
     )
+    output_mode.add_argument(
+        "--nl",
+        action="store_true",
+        help="Output each JSON value on its own line as soon as it is found",
+    )
     args = parser.parse_args()
 
-    # Read the input
+    # Open the input - it is read in chunks, never all at once
     if args.file:
         try:
-            with open(args.file, "r") as f:
-                text = f.read()
+            f = open(args.file, "r", encoding="utf-8", errors="replace")
         except Exception as e:
             print(f"Error reading file {args.file}: {e}", file=sys.stderr)
             sys.exit(1)
     else:
-        text = sys.stdin.read()
-
-    # Extract JSON objects
-    json_objects = extract_json_objects(text)
+        f = sys.stdin
+
+    found = 0
+    best = None
+    best_length = -1
+    with f:
+        for value, length in iter_json_values(f):
+            found += 1
+            if args.nl:
+                print(json.dumps(value))
+            elif args.all:
+                # Streamed, but identical to json.dumps(all_values, indent=2)
+                print("[" if found == 1 else ",")
+                print(indent_lines(json.dumps(value, indent=2)), end="")
+            elif length > best_length:
+                # The best (most complex) value is the one spanning the most text
+                best, best_length = value, length
 
     # Output the results
-    if not json_objects:
+    if not found:
         print("No valid JSON objects found.", file=sys.stderr)
         sys.exit(1)
 
     if args.all:
-        # Output all objects
-        output = json_objects
-    else:
-        # Output the best (most complex) object
-        output = max(json_objects, key=lambda x: len(json.dumps(x)))
-
-    # Always print with 2-space indent
-    print(json.dumps(output, indent=2))
+        print("\n]")
+    elif not args.nl:
+        # Always print with 2-space indent
+        print(json.dumps(best, indent=2))
 
 
 if __name__ == "__main__":
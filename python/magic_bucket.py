@@ -51,60 +51,144 @@ def create_lambda_role(role_name: str) -> str:
         return iam.get_role(RoleName=role_name)["Role"]["Arn"]
 
 
-def create_lambda_function(
-    function_name: str, role_arn: str, table_name: str, region: str
-) -> str:
-    """Create Lambda function to process S3 events and update DynamoDB."""
-    # Note the use of double braces to escape inner curly braces so that the final code has proper f-string syntax.
-    lambda_code = f"""
+# The code for the Lambda function that keeps the DynamoDB table in step
+# with the bucket. It reads the table name from the DYNAMODB_TABLE
+# environment variable, and boto3 honours AWS_ENDPOINT_URL_S3 and
+# AWS_ENDPOINT_URL_DYNAMODB, so it can be run against local stand-ins.
+LAMBDA_CODE = '''
 import json
-import boto3
+import os
+import time
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+import boto3
+from botocore.config import Config
+
+TABLE_NAME = os.environ['DYNAMODB_TABLE']
+HEAD_CONCURRENCY = int(os.environ.get('HEAD_CONCURRENCY', '16'))
+# The most items a single BatchWriteItem call accepts
+BATCH_SIZE = 25
+MAX_ATTEMPTS = 8
+
 dynamodb = boto3.client('dynamodb')
-s3 = boto3.client('s3')
+# One pooled connection per head_object thread
+s3 = boto3.client('s3', config=Config(max_pool_connections=HEAD_CONCURRENCY))
 
-def lambda_handler(event, context):
-    for record in event['Records']:
+
+def latest_events(records):
+    """Return the most recent (bucket, key, record) for each object."""
+    latest = {}
+    for record in records:
         bucket = record['s3']['bucket']['name']
-        key = urllib.parse.unquote_plus(record['s3']['object']['key'])
-        size = record['s3']['object'].get('size', 0)
-        event_time = record.get('eventTime', '')
-        event_name = record.get('eventName', '')
+        obj = record['s3']['object']
+        key = urllib.parse.unquote_plus(obj['key'])
+        sequencer = obj.get('sequencer', '').upper()
+        current = latest.get((bucket, key))
+        # Sequencers of the same length order events on the same key;
+        # otherwise fall back to the order the records arrived in
+        if (
+            current is None
+            or len(sequencer) != len(current[0])
+            or sequencer >= current[0]
+        ):
+            latest[(bucket, key)] = (sequencer, record)
+    return [(bucket, key, record) for (bucket, key), (_, record) in latest.items()]
+
+
+def head_content_type(bucket, key):
+    """Return the object's content type, or None if it no longer exists."""
+    try:
+        response = s3.head_object(Bucket=bucket, Key=key)
+    except s3.exceptions.ClientError as e:
+        if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+            return None
+        raise
+    return response.get('ContentType', 'unknown')
+
+
+def batch_write(requests):
+    """Write requests in batches of 25, retrying any unprocessed items."""
+    for start in range(0, len(requests), BATCH_SIZE):
+        pending = {TABLE_NAME: requests[start:start + BATCH_SIZE]}
+        for attempt in range(MAX_ATTEMPTS):
+            response = dynamodb.batch_write_item(RequestItems=pending)
+            pending = response.get('UnprocessedItems')
+            if not pending:
+                break
+            time.sleep(min(0.05 * 2 ** attempt, 2))
+        else:
+            # Fail the invocation so Lambda retries the whole event
+            raise RuntimeError(
+                f'{len(pending[TABLE_NAME])} items unprocessed after '
+                f'{MAX_ATTEMPTS} attempts'
+            )
+
 
+def lambda_handler(event, context):
+    created, requests = [], []
+    for bucket, key, record in latest_events(event['Records']):
+        event_name = record.get('eventName', '')
         if event_name.startswith('ObjectCreated'):
-            # Get additional metadata from S3
-            response = s3.head_object(Bucket=bucket, Key=key)
-            content_type = response.get('ContentType', 'unknown')
-
-            # Store in DynamoDB
-            dynamodb.put_item(
-                TableName='{table_name}',
-                Item={{
-                    'bucket_key': {{'S': f'{{bucket}}/{{key}}'}},
-                    'filename': {{'S': key}},
-                    'bucket': {{'S': bucket}},
-                    'size': {{'N': str(size)}},
-                    'content_type': {{'S': content_type}},
-                    'last_modified': {{'S': event_time}},
-                    'timestamp': {{'S': datetime.utcnow().isoformat()}}
-                }}
-            )
+            created.append((bucket, key, record))
         elif event_name.startswith('ObjectRemoved'):
-            # Remove from DynamoDB
-            dynamodb.delete_item(
-                TableName='{table_name}',
-                Key={{
-                    'bucket_key': {{'S': f'{{bucket}}/{{key}}'}}
-                }}
+            requests.append(
+                {'DeleteRequest': {'Key': {'bucket_key': {'S': f'{bucket}/{key}'}}}}
+            )
+
+    # Only ask S3 for the content types the event did not include
+    content_types = [
+        record['s3']['object'].get('contentType') for _, _, record in created
+    ]
+    missing = [i for i, content_type in enumerate(content_types) if not content_type]
+    if missing:
+        with ThreadPoolExecutor(max_workers=HEAD_CONCURRENCY) as executor:
+            found = executor.map(
+                lambda i: head_content_type(created[i][0], created[i][1]), missing
+            )
+            for i, content_type in zip(missing, found):
+                content_types[i] = content_type
+
+    timestamp = datetime.utcnow().isoformat()
+    for (bucket, key, record), content_type in zip(created, content_types):
+        bucket_key = f'{bucket}/{key}'
+        if content_type is None:
+            # Deleted again before we got to it
+            requests.append(
+                {'DeleteRequest': {'Key': {'bucket_key': {'S': bucket_key}}}}
             )
+            continue
+        requests.append({
+            'PutRequest': {
+                'Item': {
+                    'bucket_key': {'S': bucket_key},
+                    'filename': {'S': key},
+                    'bucket': {'S': bucket},
+                    'size': {'N': str(record['s3']['object'].get('size', 0))},
+                    'content_type': {'S': content_type},
+                    'last_modified': {'S': record.get('eventTime', '')},
+                    'timestamp': {'S': timestamp},
+                }
+            }
+        })
+
+    batch_write(requests)
 
-    return {{
+    return {
         'statusCode': 200,
-        'body': json.dumps('Successfully processed S3 event')
-    }}
-"""
+        'body': json.dumps(
+            f'Successfully processed S3 event: {len(requests)} items written'
+        )
+    }
+'''
+
+
+def create_lambda_function(
+    function_name: str, role_arn: str, table_name: str, region: str
+) -> str:
+    """Create Lambda function to process S3 events and update DynamoDB."""
+    lambda_code = LAMBDA_CODE
     # Package the lambda code as a ZIP archive in memory
     zip_buffer = io.BytesIO()
     with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
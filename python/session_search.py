@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""Full-text search across local Claude Code, Codex and pi agent sessions.
+
+Usage:
+    python session_search.py index [PATH ...]
+    python session_search.py search "s3 bucket policy" [--limit 20] [--json]
+
+Sessions are ingested into a SQLite database with an FTS5 index, one row per
+message. Indexing is incremental: each file's (size, mtime, last offset) is
+recorded, logs that have only grown are read from where the last run
+stopped, and untouched logs are skipped without being opened.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+DEFAULT_SOURCES = [
+    Path.home() / ".claude" / "projects",
+    Path.home() / ".codex" / "sessions",
+    Path.home() / ".pi" / "agent" / "sessions",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    format TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    line INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id),
+    line INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    timestamp_ms INTEGER,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_file_id ON messages (file_id);
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    text, content='messages', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_ad AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+
+def default_db_path() -> Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "session-search" / "sessions.db"
+
+
+def parse_timestamp_ms(value) -> int | None:
+    """Convert an ISO 8601 string, epoch seconds or epoch milliseconds to milliseconds."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value if value > 1e11 else value * 1000)
+    if isinstance(value, str) and value:
+        try:
+            return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() * 1000)
+        except ValueError:
+            return None
+    return None
+
+
+def text_of_blocks(content) -> list[tuple[str, str]]:
+    """Flatten a content block list into (kind, text) pairs."""
+    if isinstance(content, str):
+        return [("text", content)]
+    if not isinstance(content, list):
+        return []
+    pieces = []
+    for block in content:
+        if isinstance(block, str):
+            pieces.append(("text", block))
+            continue
+        if not isinstance(block, dict):
+            continue
+        btype = block.get("type")
+        if btype in ("text", "input_text", "output_text"):
+            pieces.append(("text", block.get("text", "")))
+        elif btype == "thinking":
+            pieces.append(("thinking", block.get("thinking", "")))
+        elif btype in ("tool_use", "toolCall"):
+            args = block.get("input", block.get("arguments"))
+            pieces.append(("tool", f"{block.get('name', 'tool')} {json.dumps(args, ensure_ascii=False)}"))
+        elif btype == "tool_result":
+            pieces.extend(("tool", text) for _, text in text_of_blocks(block.get("content")))
+    return [(kind, text) for kind, text in pieces if text and text.strip()]
+
+
+def claude_messages(entry: dict) -> Iterator[tuple[str, str, int | None]]:
+    ts = parse_timestamp_ms(entry.get("timestamp"))
+    etype = entry.get("type")
+    if etype == "summary" and entry.get("summary"):
+        yield "summary", entry["summary"], ts
+    elif etype in ("user", "assistant"):
+        message = entry.get("message") or {}
+        role = message.get("role", etype)
+        for kind, text in text_of_blocks(message.get("content")):
+            yield (role if kind == "text" else kind), text, ts
+
+
+def codex_messages(entry: dict) -> Iterator[tuple[str, str, int | None]]:
+    # event_msg entries repeat what is already in response_item, so skip them.
+    if entry.get("type") != "response_item":
+        return
+    payload = entry.get("payload") or {}
+    ts = parse_timestamp_ms(entry.get("timestamp"))
+    ptype = payload.get("type")
+    if ptype == "message":
+        for kind, text in text_of_blocks(payload.get("content")):
+            yield payload.get("role", "assistant"), text, ts
+    elif ptype in ("function_call", "custom_tool_call"):
+        yield "tool", f"{payload.get('name', 'tool')} {payload.get('arguments') or payload.get('input') or ''}", ts
+    elif ptype in ("function_call_output", "custom_tool_call_output"):
+        output = payload.get("output")
+        if output:
+            yield "tool", output if isinstance(output, str) else json.dumps(output), ts
+    elif ptype == "reasoning":
+        for item in payload.get("summary") or []:
+            if isinstance(item, dict) and item.get("text"):
+                yield "thinking", item["text"], ts
+
+
+def pi_messages(entry: dict) -> Iterator[tuple[str, str, int | None]]:
+    if entry.get("type") != "message":
+        return
+    message = entry.get("message") or {}
+    ts = parse_timestamp_ms(entry.get("timestamp")) or parse_timestamp_ms(message.get("timestamp"))
+    role = message.get("role", "assistant")
+    for kind, text in text_of_blocks(message.get("content")):
+        if role == "toolResult":
+            yield "tool", text, ts
+        else:
+            yield (role if kind == "text" else kind), text, ts
+
+
+EXTRACTORS = {
+    "claude": claude_messages,
+    "codex": codex_messages,
+    "pi": pi_messages,
+}
+
+
+def detect_format(path: Path, sample: int = 50) -> str | None:
+    """Guess the log format from the first few entries."""
+    with path.open("rb") as f:
+        for count, raw in enumerate(f):
+            if count >= sample:
+                break
+            try:
+                entry = json.loads(raw)
+            except ValueError:
+                continue
+            if not isinstance(entry, dict):
+                continue
+            etype = entry.get("type")
+            if "payload" in entry and etype in ("session_meta", "response_item", "event_msg", "turn_context"):
+                return "codex"
+            if etype in ("session", "model_change", "thinking_level_change") or (
+                etype == "message" and isinstance(entry.get("message"), dict)
+            ):
+                return "pi"
+            if etype in ("user", "assistant", "summary", "system", "file-history-snapshot"):
+                return "claude"
+    return None
+
+
+def read_messages(path: Path, fmt: str, offset: int, line: int):
+    """Yield message rows from complete lines after offset, then the new (offset, line)."""
+    extract = EXTRACTORS[fmt]
+    rows = []
+    with path.open("rb") as f:
+        f.seek(offset)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                # Partially written line: index it on a later run.
+                break
+            offset += len(raw)
+            line += 1
+            if not raw.strip():
+                continue
+            try:
+                entry = json.loads(raw)
+            except ValueError:
+                continue
+            if isinstance(entry, dict):
+                for role, text, ts in extract(entry):
+                    rows.append((line, role, ts, text))
+    return rows, offset, line
+
+
+def find_logs(sources: list[Path]) -> Iterator[tuple[Path, os.stat_result]]:
+    for source in sources:
+        if source.is_file():
+            yield source, source.stat()
+            continue
+        for dirpath, dirnames, filenames in os.walk(source):
+            for name in filenames:
+                if name.endswith(".jsonl"):
+                    path = Path(dirpath) / name
+                    try:
+                        yield path, path.stat()
+                    except OSError:
+                        continue
+
+
+def open_db(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def index_sessions(conn: sqlite3.Connection, sources: list[Path]) -> dict:
+    started = time.perf_counter()
+    known = {
+        row[1]: row
+        for row in conn.execute("SELECT id, path, format, size, mtime_ns, offset, line FROM files")
+    }
+    stats = {"files": 0, "unchanged": 0, "appended": 0, "reindexed": 0, "messages": 0, "removed": 0}
+    seen = set()
+    for path, stat in find_logs(sources):
+        key = str(path)
+        if key in seen:
+            # Reached again through an overlapping source folder.
+            continue
+        seen.add(key)
+        stats["files"] += 1
+        row = known.get(key)
+        if row is not None and row[3] == stat.st_size and row[4] == stat.st_mtime_ns:
+            stats["unchanged"] += 1
+            continue
+        with conn:
+            if row is not None and stat.st_size > row[3]:
+                # Session logs are append-only, so carry on from the last offset.
+                file_id, fmt, offset, line = row[0], row[2], row[5], row[6]
+                stats["appended"] += 1
+            else:
+                fmt = row[2] if row is not None else detect_format(path)
+                if fmt is None:
+                    continue
+                if row is not None:
+                    file_id = row[0]
+                    conn.execute("DELETE FROM messages WHERE file_id = ?", (file_id,))
+                else:
+                    file_id = conn.execute(
+                        "INSERT INTO files (path, format, size, mtime_ns, offset, line) VALUES (?, ?, 0, 0, 0, 0)",
+                        (key, fmt),
+                    ).lastrowid
+                offset, line = 0, 0
+                stats["reindexed"] += 1
+            rows, offset, line = read_messages(path, fmt, offset, line)
+            conn.executemany(
+                "INSERT INTO messages (file_id, line, role, timestamp_ms, text) VALUES (?, ?, ?, ?, ?)",
+                [(file_id, *r) for r in rows],
+            )
+            conn.execute(
+                "UPDATE files SET size = ?, mtime_ns = ?, offset = ?, line = ? WHERE id = ?",
+                (stat.st_size, stat.st_mtime_ns, offset, line, file_id),
+            )
+            stats["messages"] += len(rows)
+
+    # Forget sessions that have been deleted from the folders we just scanned.
+    roots = [str(source) for source in sources]
+    gone = [
+        row for key, row in known.items()
+        if key not in seen and any(key == root or key.startswith(root.rstrip(os.sep) + os.sep) for root in roots)
+    ]
+    with conn:
+        for row in gone:
+            conn.execute("DELETE FROM messages WHERE file_id = ?", (row[0],))
+            conn.execute("DELETE FROM files WHERE id = ?", (row[0],))
+        # Remember what was indexed so a search can refresh all of it.
+        conn.executemany("INSERT OR IGNORE INTO sources (path) VALUES (?)", [(root,) for root in roots])
+    stats["removed"] = len(gone)
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+def recorded_sources(conn: sqlite3.Connection) -> list[Path]:
+    """Every folder or file indexed so far, plus the default session folders."""
+    roots = [Path(row[0]) for row in conn.execute("SELECT path FROM sources")]
+    roots += [p.expanduser().resolve() for p in DEFAULT_SOURCES if p.exists()]
+    roots = list(dict.fromkeys(roots))
+
+    def covered(path: str) -> bool:
+        return any(path == str(root) or path.startswith(str(root).rstrip(os.sep) + os.sep) for root in roots)
+
+    # Databases built before sources were recorded: refresh those files one by one.
+    roots += [Path(row[0]) for row in conn.execute("SELECT path FROM files") if not covered(row[0])]
+    return roots
+
+
+def search(conn: sqlite3.Connection, query: str, limit: int = 20, role: str | None = None) -> list[dict]:
+    sql = """
+        SELECT files.path, files.format, messages.line, messages.role, messages.timestamp_ms,
+               snippet(messages_fts, 0, '[', ']', '…', 16), bm25(messages_fts)
+        FROM messages_fts
+        JOIN messages ON messages.id = messages_fts.rowid
+        JOIN files ON files.id = messages.file_id
+        WHERE messages_fts MATCH ?
+    """
+    params: list = [query]
+    if role:
+        sql += " AND messages.role = ?"
+        params.append(role)
+    sql += " ORDER BY bm25(messages_fts) LIMIT ?"
+    params.append(limit)
+    return [
+        {
+            "path": path,
+            "format": fmt,
+            "line": line,
+            "role": msg_role,
+            "timestamp_ms": ts,
+            "snippet": snippet,
+            "rank": rank,
+        }
+        for path, fmt, line, msg_role, ts, snippet, rank in conn.execute(sql, params)
+    ]
+
+
+def format_ms(ms: int | None) -> str:
+    if ms is None:
+        return "unknown time".ljust(23)
+    return datetime.fromtimestamp(ms / 1000).strftime("%Y-%m-%d %H:%M:%S.") + f"{ms % 1000:03d}"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Full-text search across local Claude Code, Codex and pi sessions.",
+    )
+    parser.add_argument("--db", type=Path, default=None, help=f"Database path (default: {default_db_path()})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = sub.add_parser("index", help="Ingest new and changed sessions into the index")
+    index_parser.add_argument("paths", nargs="*", type=Path, help="Folders or .jsonl files (default: Claude, Codex and pi session folders)")
+
+    search_parser = sub.add_parser("search", help="Search the index (refreshing it first)")
+    search_parser.add_argument("query", help="FTS5 query, e.g. 's3 policy' or '\"bucket policy\" NOT terraform'")
+    search_parser.add_argument("-n", "--limit", type=int, default=20, help="Maximum number of hits")
+    search_parser.add_argument("--role", help="Only match messages with this role, e.g. user, assistant, tool")
+    search_parser.add_argument("--no-index", action="store_true", help="Search without refreshing the index first")
+    search_parser.add_argument("--json", action="store_true", help="Output hits as JSON")
+
+    args = parser.parse_args()
+    conn = open_db(args.db or default_db_path())
+
+    if args.command == "index" or not args.no_index:
+        if args.command == "index":
+            sources = args.paths or [p for p in DEFAULT_SOURCES if p.exists()]
+            sources = [p.expanduser().resolve() for p in sources]
+        else:
+            sources = recorded_sources(conn)
+        stats = index_sessions(conn, sources)
+        print(
+            f"Indexed {stats['messages']} messages from {stats['appended'] + stats['reindexed']} files "
+            f"({stats['appended']} appended, {stats['reindexed']} new or rewritten, "
+            f"{stats['unchanged']} unchanged, {stats['removed']} removed) in {stats['seconds']:.2f}s",
+            file=sys.stderr,
+        )
+        if args.command == "index":
+            return 0
+
+    try:
+        hits = search(conn, args.query, args.limit, args.role)
+    except sqlite3.OperationalError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps(hits, indent=2, ensure_ascii=False))
+        return 0
+    for hit in hits:
+        print(f"{format_ms(hit['timestamp_ms'])}  {hit['role']:<9} {hit['path']}:{hit['line']}")
+        print(f"    {' '.join(hit['snippet'].split())}")
+    if not hits:
+        print("No matches.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
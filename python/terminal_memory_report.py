@@ -4,16 +4,20 @@ from __future__ import annotations
 
 import argparse
 import datetime as dt
+import functools
 import json
 import os
 import shlex
 import shutil
 import socket
+import sqlite3
 import subprocess
 import sys
+import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Dict, Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 
 APPLE_SCRIPT = r"""
@@ -44,6 +48,32 @@ TERMINAL_APP_MARKERS = (
     "/Applications/Utilities/Terminal.app/Contents/MacOS/Terminal",
 )
 
+LINUX_TERMINAL_APPS = {
+    "alacritty",
+    "foot",
+    "gnome-terminal-server",
+    "kitty",
+    "konsole",
+    "screen",
+    "terminator",
+    "tilix",
+    "tmux",
+    "wezterm-gui",
+    "xfce4-terminal",
+    "xterm",
+}
+
+TMUX_PANE_FORMAT = "\x1f".join(
+    [
+        "#{pane_tty}",
+        "#{session_name}",
+        "#{window_index}",
+        "#{pane_index}",
+        "#{window_active}",
+        "#{pane_active}",
+    ]
+)
+
 SESSION_HELPERS = {
     "login",
     "sh",
@@ -70,22 +100,36 @@ class ProcessInfo:
     comm: str
     args: str
     owner_tty: Optional[str] = None
+    pss_kb: Optional[int] = None
+    uss_kb: Optional[int] = None
 
     @property
+    def effective_pss_kb(self) -> int:
+        # Processes we are not allowed to inspect fall back to RSS.
+        return self.rss_kb if self.pss_kb is None else self.pss_kb
+
+    @property
+    def effective_uss_kb(self) -> int:
+        return self.rss_kb if self.uss_kb is None else self.uss_kb
+
+    @functools.cached_property
     def display_name(self) -> str:
         token = ""
         args = self.args.strip()
         if args:
-            try:
-                token = shlex.split(args)[0]
-            except ValueError:
-                token = args.split()[0]
+            token = args.split(None, 1)[0]
+            # Only pay for shlex when the first word actually uses quoting.
+            if any(char in token for char in "\"'\\"):
+                try:
+                    token = shlex.split(args)[0]
+                except (ValueError, IndexError):
+                    pass
         if not token:
             token = self.comm
         name = os.path.basename(token) or os.path.basename(self.comm) or self.comm
         return name.lstrip("-") or self.comm.lstrip("-") or self.comm
 
-    @property
+    @functools.cached_property
     def is_helper(self) -> bool:
         return self.display_name in {name.lstrip("-") for name in SESSION_HELPERS}
 
@@ -112,6 +156,14 @@ class SessionInfo:
     def tree_rss_kb(self) -> int:
         return sum(proc.rss_kb for proc in self.tree_processes)
 
+    @property
+    def tree_pss_kb(self) -> int:
+        return sum(proc.effective_pss_kb for proc in self.tree_processes)
+
+    @property
+    def tree_uss_kb(self) -> int:
+        return sum(proc.effective_uss_kb for proc in self.tree_processes)
+
     @property
     def detached_rss_kb(self) -> int:
         return self.tree_rss_kb - self.attached_rss_kb
@@ -264,6 +316,243 @@ def collect_processes() -> Dict[int, ProcessInfo]:
     return processes
 
 
+def linux_tty_name(tty_nr: int) -> str:
+    if tty_nr == 0:
+        return "?"
+    major = (tty_nr >> 8) & 0xFFF
+    minor = (tty_nr & 0xFF) | ((tty_nr >> 12) & 0xFFF00)
+    if 136 <= major <= 143:
+        return f"pts/{(major - 136) * 256 + minor}"
+    if major == 4:
+        return f"tty{minor}" if minor < 64 else f"ttyS{minor - 64}"
+    return f"{major}:{minor}"
+
+
+def read_proc_file(path: str) -> Optional[bytes]:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        # procfs files are generated in one go, so a short read means we are done.
+        chunk = os.read(fd, 65536)
+        chunks = [chunk]
+        while len(chunk) == 65536:
+            chunk = os.read(fd, 65536)
+            chunks.append(chunk)
+        return b"".join(chunks)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+def parse_proc_stat(raw: bytes, page_kb: int) -> Optional[Tuple[int, int, int, int, int, int, str]]:
+    """Return (pid, ppid, tty_nr, tpgid, starttime, rss_kb, comm) from a /proc/<pid>/stat line."""
+    open_paren = raw.find(b"(")
+    close_paren = raw.rfind(b")")
+    if open_paren < 0 or close_paren < 0:
+        return None
+    rest = raw[close_paren + 2 :].split()
+    if len(rest) < 22:
+        return None
+    try:
+        return (
+            int(raw[:open_paren]),
+            int(rest[1]),
+            int(rest[4]),
+            int(rest[5]),
+            int(rest[19]),
+            int(rest[21]) * page_kb,
+            raw[open_paren + 1 : close_paren].decode("utf-8", "replace"),
+        )
+    except ValueError:
+        return None
+
+
+def parse_smaps_rollup(raw: bytes) -> Tuple[int, int]:
+    """Return (pss_kb, uss_kb) from /proc/<pid>/smaps_rollup contents."""
+    pss_kb = 0
+    uss_kb = 0
+    for line in raw.splitlines():
+        if line.startswith(b"Pss:"):
+            pss_kb = int(line.split()[1])
+        elif line.startswith(b"Private_Clean:") or line.startswith(b"Private_Dirty:"):
+            uss_kb += int(line.split()[1])
+    return pss_kb, uss_kb
+
+
+def parse_environ_value(raw: bytes, name: bytes) -> Optional[str]:
+    prefix = name + b"="
+    for item in raw.split(b"\0"):
+        if item.startswith(prefix):
+            return item[len(prefix) :].decode("utf-8", "replace")
+    return None
+
+
+class MacOSCollector:
+    """Terminal.app tabs via osascript, processes via ps."""
+
+    name = "macos"
+
+    def collect(self) -> Tuple[Dict[str, SessionInfo], Dict[int, ProcessInfo]]:
+        return collect_tabs(), collect_processes()
+
+    def is_terminal_app(self, proc: ProcessInfo) -> bool:
+        return any(marker in proc.args for marker in TERMINAL_APP_MARKERS)
+
+    def read_memory_detail(self, processes: Iterable[ProcessInfo]) -> None:
+        raise RuntimeError("PSS/USS accounting needs /proc and is only available with --backend linux")
+
+
+class LinuxCollector:
+    """Read /proc directly and group sessions by TTY, tmux pane or screen window."""
+
+    name = "linux"
+
+    def __init__(self, proc_root: str = "/proc") -> None:
+        self.proc_root = proc_root
+        self.page_kb = os.sysconf("SC_PAGE_SIZE") // 1024
+        self.foreground: Dict[str, int] = {}
+        # pid -> (starttime, args); cmdline is only re-read for new or reused PIDs.
+        self.args_cache: Dict[int, Tuple[int, str]] = {}
+
+    def read_process(self, pid_text: str) -> Optional[ProcessInfo]:
+        base = f"{self.proc_root}/{pid_text}"
+        raw_stat = read_proc_file(f"{base}/stat")
+        if raw_stat is None:
+            return None
+        parsed = parse_proc_stat(raw_stat, self.page_kb)
+        if parsed is None:
+            return None
+        pid, ppid, tty_nr, tpgid, starttime, rss_kb, comm = parsed
+        cached = self.args_cache.get(pid)
+        if cached is not None and cached[0] == starttime:
+            args = cached[1]
+        else:
+            raw_cmdline = read_proc_file(f"{base}/cmdline") or b""
+            argv = [part for part in raw_cmdline.split(b"\0") if part]
+            args = " ".join(part.decode("utf-8", "replace") for part in argv) or f"[{comm}]"
+            self.args_cache[pid] = (starttime, args)
+        tty = linux_tty_name(tty_nr)
+        if tty != "?" and tpgid > 0:
+            self.foreground[tty] = tpgid
+        return ProcessInfo(pid=pid, ppid=ppid, tty=tty, rss_kb=rss_kb, comm=comm, args=args)
+
+    def collect_processes(self) -> Dict[int, ProcessInfo]:
+        self.foreground = {}
+        processes: Dict[int, ProcessInfo] = {}
+        try:
+            entries = os.listdir(self.proc_root)
+        except OSError as exc:
+            raise RuntimeError(f"Cannot read {self.proc_root}: {exc}") from exc
+        for entry in entries:
+            if not entry.isdigit():
+                continue
+            proc = self.read_process(entry)
+            if proc is not None:
+                processes[proc.pid] = proc
+        if len(self.args_cache) > len(processes):
+            self.args_cache = {
+                pid: entry for pid, entry in self.args_cache.items() if pid in processes
+            }
+        return processes
+
+    def collect_tmux_panes(self) -> Dict[str, SessionInfo]:
+        if shutil.which("tmux") is None:
+            return {}
+        try:
+            raw = run_command(["tmux", "list-panes", "-a", "-F", TMUX_PANE_FORMAT])
+        except RuntimeError:
+            # No tmux server running.
+            return {}
+        sessions: Dict[str, SessionInfo] = {}
+        for line in raw.splitlines():
+            parts = line.split("\x1f")
+            if len(parts) < 6:
+                continue
+            tty_text, session_name, window_text, pane_text = parts[:4]
+            tty = tty_text.strip().replace("/dev/", "")
+            if not tty:
+                continue
+            sessions[tty] = SessionInfo(
+                tty=tty,
+                window=int(window_text),
+                tab=int(pane_text),
+                title=f"tmux {session_name}:{window_text}.{pane_text}",
+                busy=False,
+            )
+        return sessions
+
+    def collect_screen_windows(self, processes: Dict[int, ProcessInfo]) -> Dict[str, SessionInfo]:
+        sessions: Dict[str, SessionInfo] = {}
+        for proc in processes.values():
+            parent = processes.get(proc.ppid)
+            if parent is None or proc.tty == "?" or parent.comm.lower() != "screen":
+                continue
+            raw = read_proc_file(f"{self.proc_root}/{proc.pid}/environ") or b""
+            window_text = parse_environ_value(raw, b"WINDOW")
+            if window_text is None or not window_text.isdigit():
+                continue
+            sty = parse_environ_value(raw, b"STY") or str(parent.pid)
+            sessions[proc.tty] = SessionInfo(
+                tty=proc.tty,
+                window=int(window_text),
+                tab=0,
+                title=f"screen {sty}:{window_text}",
+                busy=False,
+            )
+        return sessions
+
+    def collect(self) -> Tuple[Dict[str, SessionInfo], Dict[int, ProcessInfo]]:
+        processes = self.collect_processes()
+        sessions: Dict[str, SessionInfo] = {}
+        for proc in processes.values():
+            if proc.tty != "?" and proc.tty not in sessions:
+                sessions[proc.tty] = SessionInfo(
+                    tty=proc.tty,
+                    window=0,
+                    tab=0,
+                    title="Terminal",
+                    busy=False,
+                )
+        sessions.update(self.collect_screen_windows(processes))
+        sessions.update(self.collect_tmux_panes())
+        for tty, session in sessions.items():
+            leader = processes.get(self.foreground.get(tty, 0))
+            session.busy = leader is not None and not leader.is_helper
+        return sessions, processes
+
+    def is_terminal_app(self, proc: ProcessInfo) -> bool:
+        return proc.tty == "?" and proc.display_name.lower() in LINUX_TERMINAL_APPS
+
+    def read_smaps_rollup(self, proc: ProcessInfo) -> None:
+        raw = read_proc_file(f"{self.proc_root}/{proc.pid}/smaps_rollup")
+        if raw:
+            proc.pss_kb, proc.uss_kb = parse_smaps_rollup(raw)
+
+    def read_memory_detail(self, processes: Iterable[ProcessInfo]) -> None:
+        # smaps_rollup walks every VMA in the kernel, so it is far slower than
+        # stat; the reads release the GIL and overlap nicely across threads.
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as pool:
+            list(pool.map(self.read_smaps_rollup, processes))
+
+
+COLLECTORS = {
+    "macos": MacOSCollector,
+    "linux": LinuxCollector,
+}
+
+
+def get_collector(backend: str = "auto"):
+    if backend == "auto":
+        backend = "linux" if sys.platform.startswith("linux") else "macos"
+    try:
+        return COLLECTORS[backend]()
+    except KeyError:
+        raise RuntimeError(f"Unknown backend: {backend}") from None
+
+
 def build_children_map(processes: Dict[int, ProcessInfo]) -> Dict[int, List[int]]:
     children: Dict[int, List[int]] = defaultdict(list)
     for proc in processes.values():
@@ -271,6 +560,75 @@ def build_children_map(processes: Dict[int, ProcessInfo]) -> Dict[int, List[int]
     return children
 
 
+class ProcessTree:
+    """
+    Process table, parent -> children map and owning tab of every process,
+    patched in place between samples.
+
+    Only PIDs that appeared, exited, changed parent or changed tty - and
+    their descendants - have their owner worked out again.
+    """
+
+    def __init__(self) -> None:
+        self.processes: Dict[int, ProcessInfo] = {}
+        self.children: Dict[int, set[int]] = defaultdict(set)
+        # Owning tty of every known PID (None outside any tab), and the PIDs
+        # that do belong to a tab
+        self.owner_cache: Dict[int, Optional[str]] = {}
+        self.owned: set[int] = set()
+        self.terminal_ttys: set[str] = set()
+        self.added = 0
+        self.removed = 0
+
+    def _unlink(self, pid: int, ppid: int) -> None:
+        siblings = self.children.get(ppid)
+        if siblings is None:
+            return
+        siblings.discard(pid)
+        if not siblings:
+            del self.children[ppid]
+
+    def update(self, processes: Dict[int, ProcessInfo], terminal_ttys: set[str]) -> None:
+        previous = self.processes
+        gone = previous.keys() - processes.keys()
+        for pid in gone:
+            self._unlink(pid, previous[pid].ppid)
+        added = 0
+        changed = set(gone)
+        for pid, proc in processes.items():
+            old = previous.get(pid)
+            if old is None:
+                added += 1
+                changed.add(pid)
+                self.children[proc.ppid].add(pid)
+            elif old.ppid != proc.ppid:
+                changed.add(pid)
+                self._unlink(pid, old.ppid)
+                self.children[proc.ppid].add(pid)
+            elif old.tty != proc.tty:
+                changed.add(pid)
+        self.processes = processes
+        self.added = added
+        self.removed = len(gone)
+
+        if terminal_ttys != self.terminal_ttys:
+            # A tab opened or closed - every owner may differ
+            self.terminal_ttys = set(terminal_ttys)
+            self.owner_cache.clear()
+            self.owned.clear()
+            stale = processes.keys()
+        else:
+            stale = set(walk_descendants(changed, self.children))
+            for pid in stale:
+                self.owner_cache.pop(pid, None)
+            self.owned -= stale
+        for pid in stale:
+            if pid in processes and attribute_owner_tty(
+                pid, processes, self.terminal_ttys, self.owner_cache
+            ):
+                self.owned.add(pid)
+
+
 def walk_descendants(root_pids: Iterable[int], children_map: Dict[int, List[int]]) -> List[int]:
     seen = set()
     stack = list(root_pids)
@@ -313,27 +671,44 @@ def attribute_owner_tty(
     return owner
 
 
-def collect_report(include_self: bool = False) -> dict:
-    sessions = collect_tabs()
+def collect_report(
+    include_self: bool = False,
+    collector=None,
+    tree: Optional[ProcessTree] = None,
+    memory_detail: bool = False,
+) -> dict:
+    if collector is None:
+        collector = get_collector()
+    sessions, processes = collector.collect()
     terminal_ttys = set(sessions.keys())
-    processes = collect_processes()
-    children_map = build_children_map(processes)
+    if tree is None:
+        children_map = build_children_map(processes)
+        attached_pids = {proc.pid for proc in processes.values() if proc.tty in terminal_ttys}
+        tree_pids = set(walk_descendants(attached_pids, children_map))
+        owner_cache: Dict[int, Optional[str]] = {}
+    else:
+        tree.update(processes, terminal_ttys)
+        children_map = tree.children
+        # A process is in a tab's tree exactly when it has an owning tty
+        tree_pids = set(tree.owned)
+        attached_pids = {pid for pid in tree_pids if processes[pid].tty in terminal_ttys}
+        owner_cache = tree.owner_cache
     self_tree = set(walk_descendants([os.getpid()], children_map))
 
     terminal_app_processes = [
-        proc
-        for proc in processes.values()
-        if any(marker in proc.args for marker in TERMINAL_APP_MARKERS)
+        proc for proc in processes.values() if collector.is_terminal_app(proc)
     ]
 
-    attached_pids = {proc.pid for proc in processes.values() if proc.tty in terminal_ttys}
-    tree_pids = set(walk_descendants(attached_pids, children_map))
     if not include_self:
         attached_pids -= self_tree
         tree_pids -= self_tree
     detached_pids = tree_pids - attached_pids
 
-    owner_cache: Dict[int, Optional[str]] = {}
+    if memory_detail:
+        collector.read_memory_detail(
+            [processes[pid] for pid in tree_pids] + terminal_app_processes
+        )
+
     for pid in tree_pids:
         owner_tty = attribute_owner_tty(pid, processes, terminal_ttys, owner_cache)
         processes[pid].owner_tty = owner_tty
@@ -373,11 +748,15 @@ def collect_report(include_self: bool = False) -> dict:
             {
                 "name": proc.display_name,
                 "rss_kb": 0,
+                "pss_kb": 0,
+                "uss_kb": 0,
                 "count": 0,
                 "ttys": set(),
             },
         )
         entry["rss_kb"] += proc.rss_kb
+        entry["pss_kb"] += proc.effective_pss_kb
+        entry["uss_kb"] += proc.effective_uss_kb
         entry["count"] += 1
         if proc.owner_tty:
             entry["ttys"].add(proc.owner_tty)
@@ -387,6 +766,8 @@ def collect_report(include_self: bool = False) -> dict:
             {
                 "name": entry["name"],
                 "rss_kb": entry["rss_kb"],
+                "pss_kb": entry["pss_kb"],
+                "uss_kb": entry["uss_kb"],
                 "count": entry["count"],
                 "tabs": len(entry["ttys"]),
             }
@@ -414,9 +795,14 @@ def collect_report(include_self: bool = False) -> dict:
     idle_sessions = [session for session in session_list if session.workload_rss_kb == 0]
     busy_sessions = [session for session in session_list if session.busy]
 
-    return {
+    if not memory_detail:
+        for item in top_commands:
+            del item["pss_kb"], item["uss_kb"]
+
+    report = {
         "generated_at": dt.datetime.now().astimezone().isoformat(timespec="seconds"),
         "hostname": socket.gethostname(),
+        "backend": collector.name,
         "sessions": session_list,
         "top_commands": top_commands,
         "top_processes": top_processes,
@@ -438,14 +824,28 @@ def collect_report(include_self: bool = False) -> dict:
             "idle_rss_kb": sum(session.tree_rss_kb for session in idle_sessions),
             "busy_rss_kb": sum(session.tree_rss_kb for session in busy_sessions),
         },
+        "memory_detail": memory_detail,
     }
+    if memory_detail:
+        report["totals"].update(
+            {
+                "tree_pss_kb": sum(processes[pid].effective_pss_kb for pid in tree_pids),
+                "tree_uss_kb": sum(processes[pid].effective_uss_kb for pid in tree_pids),
+                "terminal_app_pss_kb": sum(proc.effective_pss_kb for proc in terminal_app_processes),
+                "terminal_app_uss_kb": sum(proc.effective_uss_kb for proc in terminal_app_processes),
+                "memory_detail_unavailable": sum(
+                    1 for pid in tree_pids if processes[pid].pss_kb is None
+                ),
+            }
+        )
+    return report
 
 
 def render_summary(report: dict) -> List[str]:
     totals = report["totals"]
     lines = [
         f"Terminal Memory Report on {report['hostname']}",
-        f"Generated: {report['generated_at']}",
+        f"Generated: {report['generated_at']} ({report['backend']} backend)",
         "",
         "Summary",
         f"  Tabs seen:              {totals['tabs']}",
@@ -454,12 +854,24 @@ def render_summary(report: dict) -> List[str]:
         f"  Processes on TTYs:      {totals['attached_processes']}",
         f"  Total process tree:     {totals['tree_processes']}",
         f"  Detached descendants:   {totals['detached_processes']}",
-        f"  Terminal.app RSS:       {human_kib(totals['terminal_app_rss_kb'])}",
+        f"  Terminal app RSS:       {human_kib(totals['terminal_app_rss_kb'])}",
         f"  Attached session RSS:   {human_kib(totals['attached_rss_kb'])}",
         f"  Full session tree RSS:  {human_kib(totals['tree_rss_kb'])}",
         f"  Combined total RSS:     {human_kib(totals['combined_rss_kb'])}",
-        "",
     ]
+    if report["memory_detail"]:
+        lines.extend(
+            [
+                f"  Full session tree PSS:  {human_kib(totals['tree_pss_kb'])}",
+                f"  Full session tree USS:  {human_kib(totals['tree_uss_kb'])}",
+                f"  Terminal app PSS/USS:   {human_kib(totals['terminal_app_pss_kb'])} / {human_kib(totals['terminal_app_uss_kb'])}",
+            ]
+        )
+        if totals["memory_detail_unavailable"]:
+            lines.append(
+                f"  Counted at RSS:         {totals['memory_detail_unavailable']} processes (smaps_rollup not readable)"
+            )
+    lines.append("")
     return lines
 
 
@@ -472,7 +884,7 @@ def render_breakdown(report: dict, width: int) -> List[str]:
     rows = [
         ("Workload processes", totals["workload_rss_kb"], combined),
         ("Shell/login overhead", totals["helper_rss_kb"], combined),
-        ("Terminal.app UI", totals["terminal_app_rss_kb"], combined),
+        ("Terminal app UI", totals["terminal_app_rss_kb"], combined),
     ]
     lines = ["Memory Breakdown"]
     for label, value, total in rows:
@@ -496,7 +908,7 @@ def render_sessions(report: dict, width: int, limit: int) -> List[str]:
     bar_width = min(28, max(10, width - 68))
     lines = ["Top Tabs"]
     for session in sessions:
-        slot = f"W{session.window:03d}/T{session.tab:02d}" if session.window else "W???/T??"
+        slot = f"W{session.window:03d}/T{session.tab:02d}" if session.window or session.title != "Terminal" else "W???/T??"
         label = shorten(session.label(), 34)
         lines.append(
             f"  {slot} {session.tty:<7} {human_kib(session.tree_rss_kb):>9} [{ascii_bar(session.tree_rss_kb, tree_total, bar_width)}] {pct(session.tree_rss_kb, tree_total)} {session.status:<8} {label}"
@@ -511,6 +923,10 @@ def render_sessions(report: dict, width: int, limit: int) -> List[str]:
             lines.append(
                 f"    split: attached {human_kib(session.attached_rss_kb)}, detached {human_kib(session.detached_rss_kb)}"
             )
+        if report["memory_detail"]:
+            lines.append(
+                f"    shared-aware: pss {human_kib(session.tree_pss_kb)}, uss {human_kib(session.tree_uss_kb)}"
+            )
     lines.append("")
     return lines
 
@@ -521,9 +937,10 @@ def render_commands(report: dict, width: int, limit: int) -> List[str]:
     bar_width = min(28, max(10, width - 56))
     lines = ["Top Commands"]
     for item in commands:
-        lines.append(
-            f"  {item['name']:<16} {human_kib(item['rss_kb']):>9} [{ascii_bar(item['rss_kb'], total, bar_width)}] {pct(item['rss_kb'], total)}  {item['count']:>3} procs  {item['tabs']:>3} tabs"
-        )
+        line = f"  {item['name']:<16} {human_kib(item['rss_kb']):>9} [{ascii_bar(item['rss_kb'], total, bar_width)}] {pct(item['rss_kb'], total)}  {item['count']:>3} procs  {item['tabs']:>3} tabs"
+        if "pss_kb" in item:
+            line += f"  pss {human_kib(item['pss_kb']):>9}  uss {human_kib(item['uss_kb']):>9}"
+        lines.append(line)
     lines.append("")
     return lines
 
@@ -533,15 +950,18 @@ def render_processes(report: dict, limit: int) -> List[str]:
     lines = ["Top Processes"]
     for proc in processes:
         owner = proc.owner_tty or "?"
+        detail = ""
+        if report["memory_detail"]:
+            detail = f"pss {human_kib(proc.effective_pss_kb):>9}  uss {human_kib(proc.effective_uss_kb):>9}  "
         lines.append(
-            f"  PID {proc.pid:<6} {human_kib(proc.rss_kb):>9}  {owner:<7}  {shorten(proc.short_command(88), 88)}"
+            f"  PID {proc.pid:<6} {human_kib(proc.rss_kb):>9}  {detail}{owner:<7}  {shorten(proc.short_command(88), 88)}"
         )
     lines.append("")
     return lines
 
 
-def session_to_dict(session: SessionInfo) -> dict:
-    return {
+def session_to_dict(session: SessionInfo, memory_detail: bool = False) -> dict:
+    data = {
         "tty": session.tty,
         "window": session.window,
         "tab": session.tab,
@@ -557,16 +977,21 @@ def session_to_dict(session: SessionInfo) -> dict:
             {
                 "pid": proc.pid,
                 "rss_kb": proc.rss_kb,
+                **({"pss_kb": proc.pss_kb, "uss_kb": proc.uss_kb} if memory_detail else {}),
                 "display_name": proc.display_name,
                 "command": proc.args or proc.comm,
             }
             for proc in session.top_processes[:5]
         ],
     }
+    if memory_detail:
+        data["tree_pss_kb"] = session.tree_pss_kb
+        data["tree_uss_kb"] = session.tree_uss_kb
+    return data
 
 
-def process_to_dict(proc: ProcessInfo) -> dict:
-    return {
+def process_to_dict(proc: ProcessInfo, memory_detail: bool = False) -> dict:
+    data = {
         "pid": proc.pid,
         "ppid": proc.ppid,
         "tty": proc.tty,
@@ -575,41 +1000,544 @@ def process_to_dict(proc: ProcessInfo) -> dict:
         "display_name": proc.display_name,
         "command": proc.args or proc.comm,
     }
+    if memory_detail:
+        data["pss_kb"] = proc.pss_kb
+        data["uss_kb"] = proc.uss_kb
+    return data
+
+
+def signed_kib(kib: float) -> str:
+    sign = "+" if kib > 0 else "-" if kib < 0 else " "
+    return f"{sign}{human_kib(int(abs(kib)))}"
+
+
+def colorize(text: str, kib: float, enabled: bool) -> str:
+    if not enabled or kib == 0:
+        return text
+    code = "31" if kib > 0 else "32"
+    return f"\x1b[{code}m{text}\x1b[0m"
+
+
+def render_watch(
+    report: dict,
+    tree: ProcessTree,
+    rates: Dict[str, float],
+    growth: Dict[str, int],
+    stats: dict,
+    width: int,
+    limit: int,
+    color: bool,
+) -> List[str]:
+    totals = report["totals"]
+    tree_total = totals["tree_rss_kb"]
+    bar_width = min(20, max(8, width - 92))
+    lines = [
+        f"Terminal Memory Watch on {report['hostname']} ({report['backend']} backend)  {report['generated_at']}",
+        f"  Processes: {len(tree.processes)} (+{tree.added}/-{tree.removed})  "
+        f"Sample: {stats['sample_ms']:.1f} ms  CPU: {stats['cpu_pct']:.1f}% of a core  "
+        f"Interval: {stats['interval']:g}s  Sample #{stats['samples']}",
+        f"  Session tree RSS: {human_kib(tree_total)}  "
+        f"Terminal app RSS: {human_kib(totals['terminal_app_rss_kb'])}  "
+        f"Tabs: {totals['tabs']} ({totals['busy_tabs']} busy)"
+        + (
+            f"  PSS: {human_kib(totals['tree_pss_kb'])}  USS: {human_kib(totals['tree_uss_kb'])}"
+            if report["memory_detail"]
+            else ""
+        ),
+        "",
+        f"  {'SLOT':<8} {'TTY':<7} {'RSS':>9} {'':<{bar_width + 2}} {'RATE':>12} {'SINCE START':>11}  {'STATUS':<8} LABEL",
+    ]
+    sessions: List[SessionInfo] = report["sessions"][:limit]
+    for session in sessions:
+        slot = f"W{session.window:03d}/T{session.tab:02d}" if session.window or session.title != "Terminal" else "W???/T??"
+        rate = rates.get(session.tty, 0.0)
+        since = growth.get(session.tty, 0)
+        rate_text = colorize(f"{signed_kib(rate) + '/s':>12}", rate, color)
+        since_text = colorize(f"{signed_kib(since):>11}", since, color)
+        lines.append(
+            f"  {slot} {session.tty:<7} {human_kib(session.tree_rss_kb):>9} [{ascii_bar(session.tree_rss_kb, tree_total, bar_width)}] "
+            f"{rate_text} {since_text}  {session.status:<8} {shorten(session.label(), 34)}"
+        )
+    return lines
+
+
+RECORDER_SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    id INTEGER PRIMARY KEY,
+    ts INTEGER NOT NULL,
+    hostname TEXT NOT NULL,
+    tree_rss_kb INTEGER NOT NULL,
+    terminal_app_rss_kb INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_ts ON samples (ts);
+CREATE TABLE IF NOT EXISTS strings (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS session_samples (
+    sample_id INTEGER NOT NULL,
+    tty TEXT NOT NULL,
+    label_id INTEGER NOT NULL,
+    rss_kb INTEGER NOT NULL,
+    pss_kb INTEGER,
+    PRIMARY KEY (sample_id, tty)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS process_samples (
+    sample_id INTEGER NOT NULL,
+    pid INTEGER NOT NULL,
+    ppid INTEGER NOT NULL,
+    tty TEXT,
+    command_id INTEGER NOT NULL,
+    rss_kb INTEGER NOT NULL,
+    pss_kb INTEGER,
+    uss_kb INTEGER,
+    PRIMARY KEY (sample_id, pid)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def parse_duration(text: str) -> int:
+    """Parse '90', '30s', '15m', '8h', '7d' or '2w' into seconds."""
+    text = text.strip().lower()
+    multiplier = DURATION_UNITS.get(text[-1:], None)
+    number = text[:-1] if multiplier else text
+    try:
+        value = float(number)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid duration: {text!r}") from None
+    return int(value * (multiplier or 1))
+
+
+class Recorder:
+    """Append report snapshots to a SQLite database, with retention and downsampling."""
+
+    maintenance_every = 600
+
+    def __init__(
+        self,
+        path: str,
+        retain: Optional[int] = None,
+        downsample_after: Optional[int] = None,
+        downsample_interval: int = 300,
+    ) -> None:
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(RECORDER_SCHEMA)
+        self.retain = retain
+        self.downsample_after = downsample_after
+        self.downsample_interval = downsample_interval
+        self.string_ids: Dict[str, int] = dict(
+            (text, string_id) for string_id, text in self.conn.execute("SELECT id, text FROM strings")
+        )
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def intern(self, text: str) -> int:
+        string_id = self.string_ids.get(text)
+        if string_id is None:
+            self.conn.execute("INSERT OR IGNORE INTO strings (text) VALUES (?)", (text,))
+            string_id = self.conn.execute("SELECT id FROM strings WHERE text = ?", (text,)).fetchone()[0]
+            self.string_ids[text] = string_id
+        return string_id
+
+    def record(self, report: dict, now: Optional[float] = None) -> int:
+        ts = int(now if now is not None else time.time())
+        totals = report["totals"]
+        detail = report["memory_detail"]
+        with self.conn:
+            sample_id = self.conn.execute(
+                "INSERT INTO samples (ts, hostname, tree_rss_kb, terminal_app_rss_kb) VALUES (?, ?, ?, ?)",
+                (ts, report["hostname"], totals["tree_rss_kb"], totals["terminal_app_rss_kb"]),
+            ).lastrowid
+            session_rows = []
+            process_rows = []
+            seen = set()
+            for session in report["sessions"]:
+                session_rows.append(
+                    (
+                        sample_id,
+                        session.tty,
+                        self.intern(session.label()),
+                        session.tree_rss_kb,
+                        session.tree_pss_kb if detail else None,
+                    )
+                )
+                for proc in session.tree_processes:
+                    seen.add(proc.pid)
+                    process_rows.append(self.process_row(sample_id, proc))
+            for proc in report["terminal_app_processes"]:
+                if proc.pid not in seen:
+                    process_rows.append(self.process_row(sample_id, proc))
+            self.conn.executemany("INSERT INTO session_samples VALUES (?, ?, ?, ?, ?)", session_rows)
+            self.conn.executemany("INSERT INTO process_samples VALUES (?, ?, ?, ?, ?, ?, ?, ?)", process_rows)
+        self.maybe_maintain(ts)
+        return sample_id
+
+    def process_row(self, sample_id: int, proc: ProcessInfo) -> tuple:
+        return (
+            sample_id,
+            proc.pid,
+            proc.ppid,
+            proc.owner_tty,
+            self.intern(proc.short_command(200)),
+            proc.rss_kb,
+            proc.pss_kb,
+            proc.uss_kb,
+        )
+
+    def maybe_maintain(self, ts: int) -> None:
+        if self.retain is None and self.downsample_after is None:
+            return
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'maintained_at'").fetchone()
+        if row is not None and ts - int(row[0]) < self.maintenance_every:
+            return
+        self.maintain(ts)
+
+    def delete_samples(self, where: str, params: tuple) -> int:
+        ids = [row[0] for row in self.conn.execute(f"SELECT id FROM samples WHERE {where}", params)]
+        for start in range(0, len(ids), 500):
+            chunk = ids[start : start + 500]
+            marks = ",".join("?" * len(chunk))
+            for table in ("process_samples", "session_samples"):
+                self.conn.execute(f"DELETE FROM {table} WHERE sample_id IN ({marks})", chunk)
+            self.conn.execute(f"DELETE FROM samples WHERE id IN ({marks})", chunk)
+        return len(ids)
+
+    def maintain(self, ts: int) -> int:
+        deleted = 0
+        with self.conn:
+            if self.retain is not None:
+                deleted += self.delete_samples("ts < ?", (ts - self.retain,))
+            if self.downsample_after is not None:
+                # Keep the first sample in each downsample_interval bucket.
+                deleted += self.delete_samples(
+                    "ts < ? AND id NOT IN (SELECT MIN(id) FROM samples WHERE ts < ? GROUP BY ts / ?)",
+                    (ts - self.downsample_after, ts - self.downsample_after, self.downsample_interval),
+                )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('maintained_at', ?)",
+                (str(ts),),
+            )
+        return deleted
+
+
+GROWER_QUERIES = {
+    "session": """
+        WITH spans AS (
+            SELECT tty AS key, MIN(sample_id) AS first_id, MAX(sample_id) AS last_id, MAX(rss_kb) AS peak_kb
+            FROM session_samples WHERE sample_id >= :first_id GROUP BY tty
+        )
+        SELECT spans.key, strings.text, a.rss_kb, b.rss_kb, spans.peak_kb, sa.ts, sb.ts
+        FROM spans
+        JOIN session_samples a ON a.sample_id = spans.first_id AND a.tty = spans.key
+        JOIN session_samples b ON b.sample_id = spans.last_id AND b.tty = spans.key
+        JOIN samples sa ON sa.id = spans.first_id
+        JOIN samples sb ON sb.id = spans.last_id
+        JOIN strings ON strings.id = b.label_id
+        ORDER BY b.rss_kb - a.rss_kb DESC
+        LIMIT :limit
+    """,
+    "process": """
+        WITH spans AS (
+            SELECT pid, command_id, MIN(sample_id) AS first_id, MAX(sample_id) AS last_id, MAX(rss_kb) AS peak_kb
+            FROM process_samples WHERE sample_id >= :first_id GROUP BY pid, command_id
+        )
+        SELECT spans.pid || ' ' || COALESCE(b.tty, '?'), strings.text, a.rss_kb, b.rss_kb, spans.peak_kb, sa.ts, sb.ts
+        FROM spans
+        JOIN process_samples a ON a.sample_id = spans.first_id AND a.pid = spans.pid
+        JOIN process_samples b ON b.sample_id = spans.last_id AND b.pid = spans.pid
+        JOIN samples sa ON sa.id = spans.first_id
+        JOIN samples sb ON sb.id = spans.last_id
+        JOIN strings ON strings.id = spans.command_id
+        ORDER BY b.rss_kb - a.rss_kb DESC
+        LIMIT :limit
+    """,
+}
+
+
+def query_growers(path: str, since: int, by: str = "session", limit: int = 10, now: Optional[float] = None) -> dict:
+    if not os.path.exists(path):
+        raise RuntimeError(f"No such database: {path}")
+    conn = sqlite3.connect(path)
+    try:
+        start = int(now if now is not None else time.time()) - since
+        first_id, sample_count, first_ts, last_ts = conn.execute(
+            "SELECT MIN(id), COUNT(*), MIN(ts), MAX(ts) FROM samples WHERE ts >= ?", (start,)
+        ).fetchone()
+        growers = []
+        if first_id is not None:
+            for key, label, first_kb, last_kb, peak_kb, from_ts, to_ts in conn.execute(
+                GROWER_QUERIES[by], {"first_id": first_id, "limit": limit}
+            ):
+                hours = (to_ts - from_ts) / 3600.0
+                growers.append(
+                    {
+                        "key": key,
+                        "label": label,
+                        "first_rss_kb": first_kb,
+                        "last_rss_kb": last_kb,
+                        "peak_rss_kb": peak_kb,
+                        "growth_kb": last_kb - first_kb,
+                        "growth_kb_per_hour": (last_kb - first_kb) / hours if hours > 0 else 0.0,
+                        "first_seen": dt.datetime.fromtimestamp(from_ts).astimezone().isoformat(timespec="seconds"),
+                        "last_seen": dt.datetime.fromtimestamp(to_ts).astimezone().isoformat(timespec="seconds"),
+                    }
+                )
+    finally:
+        conn.close()
+    return {
+        "by": by,
+        "since_seconds": since,
+        "samples": sample_count,
+        "from": dt.datetime.fromtimestamp(first_ts).astimezone().isoformat(timespec="seconds") if first_ts else None,
+        "to": dt.datetime.fromtimestamp(last_ts).astimezone().isoformat(timespec="seconds") if last_ts else None,
+        "growers": growers,
+    }
+
+
+def render_growers(result: dict) -> List[str]:
+    lines = [
+        f"Top {result['by']} growers: {result['samples']} samples from {result['from'] or '-'} to {result['to'] or '-'}",
+        "",
+    ]
+    for item in result["growers"]:
+        lines.append(
+            f"  {item['key']:<14} {signed_kib(item['growth_kb']):>11} ({signed_kib(item['growth_kb_per_hour'])}/h)  "
+            f"{human_kib(item['first_rss_kb'])} -> {human_kib(item['last_rss_kb'])}  peak {human_kib(item['peak_rss_kb'])}  "
+            f"{shorten(item['label'], 48)}"
+        )
+    if not result["growers"]:
+        lines.append("  No samples in that window.")
+    return lines
+
+
+def watch(
+    collector,
+    interval: float,
+    include_self: bool,
+    limit: int,
+    memory_detail: bool = False,
+    recorder: Optional[Recorder] = None,
+) -> int:
+    tree = ProcessTree()
+    baseline: Dict[str, int] = {}
+    previous: Dict[str, int] = {}
+    previous_at: Optional[float] = None
+    color = sys.stdout.isatty()
+    samples = 0
+    while True:
+        started = time.monotonic()
+        cpu_started = time.process_time()
+        report = collect_report(
+            include_self=include_self,
+            collector=collector,
+            tree=tree,
+            memory_detail=memory_detail,
+        )
+        if recorder is not None:
+            # Recording runs headless so it stays cheap as a background job.
+            recorder.record(report)
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+            continue
+        sample_seconds = time.monotonic() - started
+        cpu_seconds = time.process_time() - cpu_started
+        samples += 1
+
+        current = {session.tty: session.tree_rss_kb for session in report["sessions"]}
+        elapsed = started - previous_at if previous_at is not None else 0.0
+        rates = {
+            tty: (rss - previous[tty]) / elapsed
+            for tty, rss in current.items()
+            if elapsed > 0 and tty in previous
+        }
+        for tty, rss in current.items():
+            baseline.setdefault(tty, rss)
+        growth = {tty: rss - baseline[tty] for tty, rss in current.items()}
+        # Rank by growth rate first so leaking tabs float to the top.
+        report["sessions"].sort(
+            key=lambda session: (rates.get(session.tty, 0.0), session.tree_rss_kb),
+            reverse=True,
+        )
+
+        stats = {
+            "sample_ms": sample_seconds * 1000,
+            "cpu_pct": 100.0 * cpu_seconds / max(interval, sample_seconds),
+            "interval": interval,
+            "samples": samples,
+        }
+        width = shutil.get_terminal_size((120, 24)).columns
+        lines = render_watch(report, tree, rates, growth, stats, width, limit, color)
+        if color:
+            sys.stdout.write("\x1b[H\x1b[2J")
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+        previous = current
+        previous_at = started
+        time.sleep(max(0.0, interval - (time.monotonic() - started)))
 
 
 def render_json(report: dict, top_sessions: int, top_commands: int, top_processes: int) -> str:
     payload = {
         "generated_at": report["generated_at"],
         "hostname": report["hostname"],
+        "backend": report["backend"],
         "totals": report["totals"],
-        "sessions": [session_to_dict(session) for session in report["sessions"][:top_sessions]],
+        "sessions": [
+            session_to_dict(session, report["memory_detail"])
+            for session in report["sessions"][:top_sessions]
+        ],
         "top_commands": report["top_commands"][:top_commands],
-        "top_processes": [process_to_dict(proc) for proc in report["top_processes"][:top_processes]],
-        "terminal_app_processes": [process_to_dict(proc) for proc in report["terminal_app_processes"]],
+        "top_processes": [
+            process_to_dict(proc, report["memory_detail"])
+            for proc in report["top_processes"][:top_processes]
+        ],
+        "terminal_app_processes": [
+            process_to_dict(proc, report["memory_detail"])
+            for proc in report["terminal_app_processes"]
+        ],
     }
     return json.dumps(payload, indent=2)
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
-        description="Inspect Terminal.app tabs and report their RAM usage.",
+        description="Inspect terminal sessions and report their RAM usage.",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    query = subparsers.add_parser(
+        "query",
+        help="Report the top memory growers recorded with --record.",
+    )
+    query.add_argument("database", help="SQLite database written by --record.")
+    query.add_argument(
+        "--since",
+        type=parse_duration,
+        default=parse_duration("24h"),
+        help="Time window to compare, e.g. 30m, 8h, 7d (default: 24h).",
+    )
+    query.add_argument("--by", choices=sorted(GROWER_QUERIES), default="session", help="Group growth by tab or by process.")
+    query.add_argument("--limit", type=int, default=10, help="How many growers to show.")
+    query.add_argument("--json", action="store_true", help="Emit JSON instead of text.")
+    parser.add_argument(
+        "--backend",
+        choices=["auto", *COLLECTORS],
+        default="auto",
+        help="Process collector: Terminal.app + ps on macOS, /proc on Linux.",
     )
     parser.add_argument("--top-sessions", type=int, default=12, help="How many tabs to show.")
     parser.add_argument("--top-commands", type=int, default=10, help="How many command groups to show.")
     parser.add_argument("--top-processes", type=int, default=12, help="How many individual processes to show.")
     parser.add_argument("--include-self", action="store_true", help="Include the report process itself in the totals.")
     parser.add_argument("--json", action="store_true", help="Emit JSON instead of the text report.")
-    return parser.parse_args()
+    parser.add_argument(
+        "--pss",
+        action="store_true",
+        help="Also report shared-memory-aware PSS/USS from /proc/<pid>/smaps_rollup (Linux only).",
+    )
+    parser.add_argument(
+        "--watch",
+        type=float,
+        metavar="INTERVAL",
+        help="Refresh a top-like view every INTERVAL seconds, showing per-tab RSS growth.",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="DATABASE",
+        help="Append the snapshot to a SQLite database instead of printing it. With --watch, record every INTERVAL seconds.",
+    )
+    parser.add_argument(
+        "--retain",
+        type=parse_duration,
+        help="With --record, delete samples older than this, e.g. 14d.",
+    )
+    parser.add_argument(
+        "--downsample-after",
+        type=parse_duration,
+        help="With --record, thin samples older than this to one per --downsample-interval.",
+    )
+    parser.add_argument(
+        "--downsample-interval",
+        type=parse_duration,
+        default=parse_duration("5m"),
+        help="Bucket size used by --downsample-after (default: 5m).",
+    )
+    args = parser.parse_args()
+    if args.watch is not None:
+        if args.watch <= 0:
+            parser.error("--watch INTERVAL must be greater than zero")
+        if args.json:
+            parser.error("--watch cannot be combined with --json")
+    if getattr(args, "record", None) and args.json:
+        parser.error("--record cannot be combined with --json")
+    if args.downsample_interval <= 0:
+        parser.error("--downsample-interval must be at least one second")
+    return args
 
 
 def main() -> int:
     args = parse_args()
+    if args.command == "query":
+        try:
+            result = query_growers(args.database, args.since, args.by, args.limit)
+        except (RuntimeError, sqlite3.Error) as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 1
+        if args.json:
+            print(json.dumps(result, indent=2))
+        else:
+            print("\n".join(render_growers(result)))
+        return 0
+
+    recorder = None
+    if args.record:
+        recorder = Recorder(
+            args.record,
+            retain=args.retain,
+            downsample_after=args.downsample_after,
+            downsample_interval=args.downsample_interval,
+        )
+    if args.watch is not None:
+        try:
+            return watch(
+                get_collector(args.backend),
+                args.watch,
+                args.include_self,
+                args.top_sessions,
+                args.pss,
+                recorder,
+            )
+        except RuntimeError as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 1
+        except KeyboardInterrupt:
+            return 0
+        finally:
+            if recorder is not None:
+                recorder.close()
     try:
-        report = collect_report(include_self=args.include_self)
+        report = collect_report(
+            include_self=args.include_self,
+            collector=get_collector(args.backend),
+            memory_detail=args.pss,
+        )
     except RuntimeError as exc:
         print(f"error: {exc}", file=sys.stderr)
         return 1
 
+    if recorder is not None:
+        recorder.record(report)
+        recorder.close()
+        return 0
+
     if args.json:
         print(render_json(report, args.top_sessions, args.top_commands, args.top_processes))
         return 0
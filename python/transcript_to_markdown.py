@@ -0,0 +1,1062 @@
+#!/usr/bin/env python3
+"""Convert Claude Code, Codex or pi agent JSONL session logs to Markdown.
+
+Usage:
+    python transcript_to_markdown.py session.jsonl [-o output.md] [--format auto|claude|codex|pi]
+    python transcript_to_markdown.py ~/.claude/projects [-o output-dir] [-j JOBS]
+
+One streaming engine reads the log a line at a time and hands each decoded
+entry to a format-specific renderer, which returns Markdown that is written
+out immediately. Renderers that need lookahead (Codex wants the *last*
+token_count event, pi wants model metadata in the header) do a lightweight
+first pass that only decodes the handful of lines they care about, so memory
+use stays flat no matter how large the session is.
+
+Given a directory, every .jsonl file below it is converted on a process pool.
+A manifest of source sizes and mtimes is kept in the output directory so that
+unchanged sessions are skipped on the next run.
+
+With --follow the converter keeps running while an agent is still writing
+the log, appending Markdown for each new complete line as it arrives.
+
+--max-tool-result and --dedupe-tool-results keep repeated file reads and
+huge command outputs from dwarfing the conversation itself.
+
+Lines are decoded with orjson when it is installed, falling back to the
+standard library json module otherwise.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import select
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, TextIO
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data: bytes | str) -> object:
+    """Decode JSON, using orjson when available.
+
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers only
+    need to catch the latter. Anything orjson rejects is retried with the
+    standard library, which also accepts NaN, Infinity and huge integers.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+JSON_CONTAINER_START = re.compile(r"\s*[\[{]")
+
+
+def iter_lines(path: Path, start: int = 0) -> Iterator[tuple[int, int, bytes]]:
+    """Yield (line_number, byte_offset, line) for every non-blank line.
+
+    Lines are yielded as raw bytes, trailing newline included - both JSON
+    decoders ignore surrounding whitespace, so there is no need to copy
+    each line just to strip it.
+    """
+    with path.open("rb") as f:
+        f.seek(start)
+        offset = start
+        for number, raw in enumerate(f, 1):
+            line_offset = offset
+            offset += len(raw)
+            if not raw.isspace():
+                yield number, line_offset, raw
+
+
+class ToolResultCompactor:
+    """Cap tool results at a head/tail excerpt and replace repeats with a hash reference."""
+
+    def __init__(self, max_bytes: int | None = None, dedupe: bool = False):
+        self.max_bytes = max_bytes
+        self.dedupe = dedupe
+        self.seen: set[str] = set()
+        self.results = 0
+        self.truncated = 0
+        self.deduplicated = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def excerpt(self, data: bytes) -> bytes:
+        half = self.max_bytes // 2
+        head = data[:half]
+        tail = data[len(data) - half:]
+        # Prefer to cut on line boundaries when there is one nearby.
+        cut = head.rfind(b"\n")
+        if cut > half // 2:
+            head = head[:cut + 1]
+        cut = tail.find(b"\n")
+        if 0 <= cut < half // 2:
+            tail = tail[cut + 1:]
+        omitted = len(data) - len(head) - len(tail)
+        marker = f"\n… [{omitted:,} bytes omitted] …\n".encode("utf-8")
+        return head.rstrip(b"\n") + marker + tail.lstrip(b"\n")
+
+    def compact(self, text: str) -> tuple[str, str | None, str | None]:
+        """Return (text, digest, reference) - reference is set for a repeated result."""
+        data = text.encode("utf-8")
+        self.results += 1
+        self.bytes_in += len(data)
+        digest = None
+        if self.dedupe:
+            digest = hashlib.sha256(data).hexdigest()[:12]
+            if digest in self.seen:
+                self.deduplicated += 1
+                reference = f"same as `sha256:{digest}` above ({len(data):,} bytes)"
+                self.bytes_out += len(reference)
+                return "", digest, reference
+            self.seen.add(digest)
+        if self.max_bytes is not None and len(data) > self.max_bytes:
+            excerpt = self.excerpt(data)
+            if len(excerpt) < len(data):
+                self.truncated += 1
+                data = excerpt
+                text = data.decode("utf-8", "ignore")
+        self.bytes_out += len(data)
+        return text, digest, None
+
+    def summary(self) -> str:
+        saved = self.bytes_in - self.bytes_out
+        percent = 100.0 * saved / self.bytes_in if self.bytes_in else 0.0
+        return (
+            f"Tool results: {self.results} ({self.truncated} truncated, {self.deduplicated} deduplicated), "
+            f"{self.bytes_in:,} -> {self.bytes_out:,} bytes, saved {saved:,} bytes ({percent:.0f}%)"
+        )
+
+
+class TranscriptRenderer:
+    """Base class for format-specific renderers used by convert()."""
+
+    name = ""
+
+    def __init__(self, include_thinking: bool = True, compactor: ToolResultCompactor | None = None):
+        self.include_thinking = include_thinking
+        self.compactor = compactor
+        # Set by follow(): the log is still growing, so no lookahead is final.
+        self.following = False
+
+    def scan(self, path: Path) -> None:
+        """Optional first pass over the file, for renderers that need lookahead."""
+
+    def header(self, path: Path) -> str:
+        return ""
+
+    def render_entry(self, entry: object, offset: int) -> str | None:
+        raise NotImplementedError
+
+    def render_invalid(self, number: int, line: bytes, exc: Exception) -> str | None:
+        return None
+
+    def footer(self) -> str:
+        return ""
+
+
+def convert(path: Path, out: TextIO, renderer: TranscriptRenderer) -> int:
+    """Stream path through renderer into out, returning the number of entries rendered."""
+    renderer.scan(path)
+    out.write(renderer.header(path))
+    rendered = render_lines(iter_lines(path), out, renderer)
+    out.write(renderer.footer())
+    return rendered
+
+
+def render_lines(
+    lines: Iterable[tuple[int, int, bytes]], out: TextIO, renderer: TranscriptRenderer
+) -> int:
+    rendered = 0
+    for number, offset, line in lines:
+        try:
+            entry = loads(line)
+        except json.JSONDecodeError as exc:
+            chunk = renderer.render_invalid(number, line.strip(), exc)
+        else:
+            try:
+                chunk = renderer.render_entry(entry, offset)
+            except Exception as e:
+                print(f"Warning: Error processing line {number}: {e}", file=sys.stderr)
+                continue
+            if chunk:
+                rendered += 1
+        if chunk:
+            out.write(chunk)
+    return rendered
+
+
+class FileWatcher:
+    """Wait for a file to change, using inotify on Linux and polling elsewhere."""
+
+    IN_MODIFY = 0x002
+    IN_ATTRIB = 0x004
+    IN_CLOSE_WRITE = 0x008
+    IN_DELETE_SELF = 0x400
+    IN_MOVE_SELF = 0x800
+
+    def __init__(self, path: Path, poll_interval: float = 1.0):
+        self.poll_interval = poll_interval
+        self.fd = None
+        try:
+            import ctypes
+            import ctypes.util
+
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                return
+            mask = (
+                self.IN_MODIFY | self.IN_ATTRIB | self.IN_CLOSE_WRITE
+                | self.IN_DELETE_SELF | self.IN_MOVE_SELF
+            )
+            if libc.inotify_add_watch(fd, os.fsencode(path), mask) < 0:
+                os.close(fd)
+                return
+            self.fd = fd
+        except (OSError, AttributeError):
+            # No inotify (macOS, BSD) - fall back to polling.
+            self.fd = None
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if self.fd is not None else "polling"
+
+    def wait(self) -> None:
+        if self.fd is None:
+            time.sleep(self.poll_interval)
+            return
+        # The timeout is a safety net for changes inotify cannot see, such as
+        # the log being replaced on a network filesystem.
+        ready, _, _ = select.select([self.fd], [], [], max(self.poll_interval, 5.0))
+        if ready:
+            try:
+                while os.read(self.fd, 65536):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def close(self) -> None:
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class LogTail:
+    """Remember how far into a growing log we have read."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.offset = 0
+        self.number = 1
+
+    def read_new(self) -> Iterator[tuple[int, int, bytes]]:
+        """Yield complete new lines, stopping before a partially written final line."""
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return
+        if size < self.offset:
+            print(f"{self.path} was truncated, starting again from the top", file=sys.stderr)
+            self.offset, self.number = 0, 1
+        if size == self.offset:
+            return
+        with self.path.open("rb") as f:
+            f.seek(self.offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    # Picked up again once the writer finishes the line.
+                    return
+                line_offset = self.offset
+                number = self.number
+                self.offset += len(raw)
+                self.number += 1
+                if not raw.isspace():
+                    yield number, line_offset, raw
+
+
+def follow(path: Path, out: TextIO, renderer: TranscriptRenderer, poll_interval: float = 1.0) -> int:
+    """Convert path, then keep appending Markdown for new lines until interrupted."""
+    renderer.following = True
+    renderer.scan(path)
+    out.write(renderer.header(path))
+    tail = LogTail(path)
+    rendered = 0
+    watcher = FileWatcher(path, poll_interval)
+    print(f"Following {path} ({watcher.mode}), Ctrl+C to stop", file=sys.stderr)
+    try:
+        while True:
+            rendered += render_lines(tail.read_new(), out, renderer)
+            out.flush()
+            watcher.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        out.write(renderer.footer())
+        out.flush()
+    return rendered
+
+
+# Claude Code
+
+
+def format_timestamp(ts):
+    """Format ISO timestamp to readable format."""
+    try:
+        dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+        return dt.strftime("%Y-%m-%d %H:%M:%S")
+    except:
+        return ts
+
+
+def format_tool_use(tool):
+    """Format tool use content."""
+    name = tool.get("name", "Unknown")
+    tool_input = tool.get("input", {})
+
+    md = f"**Tool:** `{name}`\n\n"
+
+    if tool_input:
+        md += "**Input:**\n```json\n"
+        md += json.dumps(tool_input, indent=2)
+        md += "\n```\n"
+
+    return md
+
+
+def format_tool_result(result, compactor=None):
+    """Format tool result content."""
+    content = result.get("content", "")
+
+    if isinstance(content, list):
+        # Handle structured content
+        parts = []
+        for item in content:
+            if isinstance(item, dict):
+                if item.get("type") == "text":
+                    parts.append(item.get("text", ""))
+            else:
+                parts.append(str(item))
+        content = "\n".join(parts)
+
+    if compactor is not None:
+        content, digest, reference = compactor.compact(str(content))
+        if reference:
+            return f"**Result:** {reference}\n"
+        if digest:
+            return f"**Result:** `sha256:{digest}`\n```\n{content}\n```\n"
+
+    md = "**Result:**\n```\n"
+    md += str(content)
+    md += "\n```\n"
+
+    return md
+
+
+def format_message_content(content, include_thinking=True, compactor=None):
+    """Format message content (can be text, tool use, thinking, etc)."""
+    if isinstance(content, str):
+        return content
+
+    if isinstance(content, list):
+        parts = []
+        for item in content:
+            if isinstance(item, dict):
+                msg_type = item.get("type", "text")
+
+                if msg_type == "text":
+                    parts.append(item.get("text", ""))
+                elif msg_type == "thinking":
+                    thinking = item.get("thinking", "")
+                    if thinking and include_thinking:
+                        parts.append(
+                            f"<details>\n<summary>💭 Thinking</summary>\n\n{thinking}\n</details>"
+                        )
+                elif msg_type == "tool_use":
+                    parts.append(format_tool_use(item))
+                elif msg_type == "tool_result":
+                    parts.append(format_tool_result(item, compactor))
+            else:
+                parts.append(str(item))
+        return "\n\n".join(parts)
+
+    return str(content)
+
+
+class ClaudeRenderer(TranscriptRenderer):
+    """Claude Code ~/.claude/projects/*/*.jsonl logs."""
+
+    name = "claude"
+
+    def header(self, path: Path) -> str:
+        return (
+            "# Claude Code Conversation Log\n\n"
+            f"**Source:** `{path.name}`  \n"
+            f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+            "---\n\n"
+        )
+
+    def render_entry(self, data, offset):
+        if not isinstance(data, dict):
+            return None
+        entry_type = data.get("type", "unknown")
+
+        # Process user and assistant messages
+        if entry_type not in ["user", "assistant"]:
+            return None
+
+        message = data.get("message", {})
+        role = message.get("role", entry_type)
+        content = message.get("content", "")
+        timestamp = data.get("timestamp", "")
+
+        # Format header
+        icon = "👤" if role == "user" else "🤖"
+        header = f"## {icon} {role.upper()}"
+
+        if timestamp:
+            header += f" — {format_timestamp(timestamp)}"
+
+        formatted_content = format_message_content(content, self.include_thinking, self.compactor)
+
+        # Add metadata if available
+        metadata = []
+        if entry_type == "assistant":
+            model = message.get("model", "")
+            if model:
+                metadata.append(f"**Model:** `{model}`")
+
+            usage = message.get("usage", {})
+            if usage:
+                input_tokens = usage.get("input_tokens", 0)
+                output_tokens = usage.get("output_tokens", 0)
+                metadata.append(f"**Tokens:** {input_tokens} in / {output_tokens} out")
+
+        cwd = data.get("cwd", "")
+        if cwd:
+            metadata.append(f"**Working Dir:** `{cwd}`")
+
+        result = f"{header}\n\n"
+        if metadata:
+            result += "\n".join(metadata) + "\n\n"
+        result += f"{formatted_content}\n\n---\n"
+        return result
+
+
+# Codex
+
+
+def format_scalar(value: object) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return str(value)
+
+
+def format_block(text: str, indent: int) -> list[str]:
+    spaces = "  " * indent
+    inner = text.splitlines() or [""]
+    lines = [f"{spaces}```"]
+    lines.extend(f"{spaces}{line}" for line in inner)
+    lines.append(f"{spaces}```")
+    return lines
+
+
+def command_has_multiline(command: Iterable[object]) -> bool:
+    for item in command:
+        if isinstance(item, str) and "\n" in item:
+            return True
+    return False
+
+
+def format_command_list(command: Iterable[object], indent: int) -> list[str]:
+    spaces = "  " * indent
+    lines: list[str] = []
+    for idx, item in enumerate(command, 1):
+        if isinstance(item, str) and "\n" in item:
+            lines.append(f"{spaces}- arg {idx} (script):")
+            lines.extend(format_block(item, indent + 1))
+        else:
+            lines.append(f"{spaces}- `{format_scalar(item)}`")
+    return lines
+
+
+def is_embedded_command(parsed: object) -> bool:
+    if not isinstance(parsed, dict):
+        return False
+    command = parsed.get("command")
+    return isinstance(command, list) and command_has_multiline(command)
+
+
+def try_parse_structured_json(text: str) -> object | None:
+    # Most strings are plain text; only pay for a decode attempt when the
+    # first non-space character could open an object or array.
+    if not JSON_CONTAINER_START.match(text):
+        return None
+    try:
+        parsed = loads(text)
+    except (TypeError, json.JSONDecodeError):
+        return None
+    if isinstance(parsed, (dict, list)):
+        return parsed
+    return None
+
+
+def format_value(value: object, indent: int = 0) -> list[str]:
+    spaces = "  " * indent
+    if isinstance(value, dict):
+        lines: list[str] = []
+        for key, val in value.items():
+            if (
+                key == "command"
+                and isinstance(val, list)
+                and command_has_multiline(val)
+            ):
+                lines.append(f"{spaces}- **{key}**:")
+                lines.extend(format_command_list(val, indent + 1))
+            elif isinstance(val, (dict, list)):
+                lines.append(f"{spaces}- **{key}**:")
+                lines.extend(format_value(val, indent + 1))
+            elif isinstance(val, str):
+                if key == "encrypted_content":
+                    byte_count = len(val.encode("utf-8"))
+                    lines.append(
+                        f"{spaces}- **{key}**: encrypted_content: {byte_count} bytes"
+                    )
+                    continue
+                # Decoded once, whether it turns out to be an embedded
+                # command or structured arguments/output.
+                structured = try_parse_structured_json(val)
+                if structured is not None and (
+                    key in {"arguments", "output"} or is_embedded_command(structured)
+                ):
+                    lines.append(f"{spaces}- **{key}**:")
+                    lines.extend(format_value(structured, indent + 1))
+                    continue
+                if "\n" in val or len(val) > 80:
+                    lines.append(f"{spaces}- **{key}**:")
+                    lines.extend(format_block(val, indent + 1))
+                else:
+                    lines.append(f"{spaces}- **{key}**: {format_scalar(val)}")
+            else:
+                lines.append(f"{spaces}- **{key}**: {format_scalar(val)}")
+        return lines
+    if isinstance(value, list):
+        lines = []
+        for idx, item in enumerate(value, 1):
+            label = f"item {idx}" if isinstance(item, (dict, list)) else None
+            if isinstance(item, (dict, list)):
+                lines.append(f"{spaces}- {label}:")
+                lines.extend(format_value(item, indent + 1))
+            elif isinstance(item, str) and ("\n" in item or len(item) > 80):
+                lines.append(f"{spaces}- entry {idx}:")
+                lines.extend(format_block(item, indent + 1))
+            else:
+                lines.append(f"{spaces}- {format_scalar(item)}")
+        return lines
+    if isinstance(value, str) and ("\n" in value or len(value) > 80):
+        return format_block(value, indent)
+    return [f"{spaces}- {format_scalar(value)}"]
+
+
+def is_token_count(entry: dict) -> bool:
+    payload = entry.get("payload")
+    return (
+        entry.get("type") == "event_msg"
+        and isinstance(payload, dict)
+        and payload.get("type") == "token_count"
+    )
+
+
+class CodexRenderer(TranscriptRenderer):
+    """Codex CLI ~/.codex/sessions/**/rollout-*.jsonl logs."""
+
+    name = "codex"
+
+    def __init__(self, include_thinking: bool = True, compactor: ToolResultCompactor | None = None):
+        super().__init__(include_thinking, compactor)
+        self.session_meta: dict | None = None
+        self.last_token_count_offset: int | None = None
+        self.has_entries = False
+
+    def scan(self, path: Path) -> None:
+        # Only session_meta and token_count lines matter here, so skip
+        # decoding everything else.
+        for number, offset, line in iter_lines(path):
+            self.has_entries = True
+            if b"session_meta" not in line and b"token_count" not in line:
+                continue
+            try:
+                entry = loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(entry, dict):
+                continue
+            if self.session_meta is None and entry.get("type") == "session_meta":
+                self.session_meta = entry
+            elif is_token_count(entry):
+                self.last_token_count_offset = offset
+
+    def header(self, path: Path) -> str:
+        if not self.has_entries and not self.following:
+            return f"# Session Log\n\n_No entries found in {path.name}_.\n"
+
+        session_meta = self.session_meta
+        title = "Session Log"
+        if session_meta:
+            payload = session_meta.get("payload", {})
+            identifier = payload.get("id")
+            if identifier:
+                title = f"Session Log `{identifier}`"
+
+        lines = [f"# {title}"]
+        if session_meta:
+            lines.append("\n## Session Metadata")
+            meta_payload = session_meta.get("payload", {})
+            lines.extend(
+                format_value(
+                    {
+                        "timestamp": session_meta.get("timestamp"),
+                        "cwd": meta_payload.get("cwd"),
+                        "originator": meta_payload.get("originator"),
+                        "cli_version": meta_payload.get("cli_version"),
+                        "instructions": meta_payload.get("instructions"),
+                    }
+                )
+            )
+        lines.append("\n## Events")
+        return "\n".join(lines) + "\n"
+
+    def render_entry(self, entry, offset):
+        if not isinstance(entry, dict):
+            return None
+        # While following, later token_count events may still arrive, so none
+        # of them is known to be the last one.
+        if (self.following or offset != self.last_token_count_offset) and is_token_count(entry):
+            return None
+        timestamp = entry.get("timestamp", "unknown time")
+        entry_type = entry.get("type", "unknown type")
+        lines = [f"\n### {timestamp} · {entry_type}"]
+        payload = entry.get("payload")
+        if payload is None:
+            lines.append("- _No payload_")
+        else:
+            lines.extend(format_value(payload))
+        return "\n".join(lines) + "\n"
+
+    def render_invalid(self, number, line, exc):
+        raise SystemExit(f"Failed to parse JSON on line {number}: {exc}")
+
+
+# pi
+
+
+def fence(text: str, lang: str = "") -> str:
+    """Wrap text in a fenced code block, widening the fence if needed."""
+    max_fence = max([len(m) for m in re.findall(r"^`{3,}", text, flags=re.M)] + [0])
+    marker = "`" * max(4, max_fence + 1)
+    return f"{marker}{lang}\n{text.rstrip()}\n{marker}"
+
+
+def render_tool_call(block: dict) -> str:
+    name = block.get("name", "tool")
+    args = block.get("arguments", {})
+    body = json.dumps(args, indent=2, ensure_ascii=False) if isinstance(args, (dict, list)) else str(args)
+    lang = {"bash": "bash", "read": "", "write": "", "edit": ""}.get(name, "")
+    return f"**🔧 `{name}`**\n\n{fence(body, lang)}"
+
+
+def render_tool_result(block: dict, compactor: ToolResultCompactor | None = None) -> str:
+    name = block.get("toolName") or "result"
+    content = block.get("content", [])
+    if isinstance(content, list):
+        text = "\n".join(c.get("text", "") for c in content if isinstance(c, dict))
+    else:
+        text = str(content)
+    isError = block.get("isError") or (block.get("content") and isinstance(block["content"], list)
+                                      and any(isinstance(c, dict) and c.get("type") == "error" for c in block["content"]))
+    label = f"**❌ {name} failed**" if isError else f"**↩️ `{name}` result**"
+    if compactor is not None and text:
+        text, digest, reference = compactor.compact(text)
+        if reference:
+            return f"{label} {reference}"
+        if digest:
+            label += f" `sha256:{digest}`"
+    return f"{label}\n\n{fence(text or '(empty)', '')}"
+
+
+def render_message(d: dict, include_thinking: bool, compactor: ToolResultCompactor | None = None) -> list[str]:
+    """Render one 'message' line into a list of markdown chunks."""
+    m = d["message"]
+    role = m.get("role")
+    content = m.get("content", [])
+    if not isinstance(content, list):
+        content = [{"type": "text", "text": str(content)}]
+
+    parts: list[str] = []
+    if role == "user":
+        text = "\n\n".join(c.get("text", "") for c in content if c.get("type") == "text").strip()
+        parts.append(f"## 💬 User\n\n{text}")
+    elif role == "assistant":
+        body: list[str] = []
+        for c in content:
+            ctype = c.get("type")
+            if ctype == "thinking" and include_thinking:
+                body.append(f"<details>\n<summary>🧠 Thinking</summary>\n\n{c.get('thinking', '').strip()}\n\n</details>")
+            elif ctype == "text":
+                body.append(c.get("text", "").strip())
+            elif ctype == "toolCall":
+                body.append(render_tool_call(c))
+        if body:
+            parts.append("\n\n".join(body))
+    elif role == "toolResult":
+        for c in content if isinstance(content, list) else [content]:
+            # toolResult lines carry their own fields; handle both shapes
+            src = c if (c.get("toolCallId") or c.get("toolName")) else m
+            parts.append(render_tool_result(src, compactor))
+    return parts
+
+
+class PiRenderer(TranscriptRenderer):
+    """pi agent session logs."""
+
+    name = "pi"
+
+    def __init__(self, include_thinking: bool = True, compactor: ToolResultCompactor | None = None):
+        super().__init__(include_thinking, compactor)
+        self.session_meta: dict = {}
+        self.started = False
+        self.wrote_text = False
+        # Trailing whitespace is held back so the output ends exactly as if
+        # all chunks had been joined and rstripped.
+        self.pending = ""
+
+    def scan(self, path: Path) -> None:
+        for number, offset, line in iter_lines(path):
+            if b'"type":"message"' in line or b'"type": "message"' in line:
+                continue
+            try:
+                d = loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(d, dict):
+                self.update_meta(d)
+
+    def update_meta(self, d: dict) -> None:
+        t = d.get("type")
+        if t == "session":
+            self.session_meta.update({k: d[k] for k in ("id", "cwd", "version") if k in d})
+        elif t == "model_change" and "modelId" in d:
+            self.session_meta["model"] = f"{d.get('provider', '')}/{d['modelId']}" if d.get("provider") else d["modelId"]
+        elif t == "thinking_level_change":
+            self.session_meta.setdefault("thinkingLevel", d.get("thinkingLevel"))
+
+    def header(self, path: Path) -> str:
+        header = ["# Session Transcript", ""]
+        for label, key in [("Session ID", "id"), ("Model", "model"),
+                           ("Working dir", "cwd"), ("Thinking level", "thinkingLevel")]:
+            if self.session_meta.get(key):
+                v = str(self.session_meta[key])
+                header.append(f"- **{label}:** `{v}`" if key != "id" else f"- **{label}:** {v}")
+        return "\n".join(header).rstrip() + "\n\n---\n\n"
+
+    def emit(self, chunks: list[str]) -> str:
+        out = []
+        for chunk in chunks:
+            text = ("\n\n" if self.started else "") + chunk
+            self.started = True
+            stripped = text.rstrip()
+            if stripped:
+                out.append(self.pending + stripped)
+                self.pending = text[len(stripped):]
+                self.wrote_text = True
+            else:
+                self.pending += text
+        return "".join(out)
+
+    def render_entry(self, d, offset):
+        if not isinstance(d, dict) or d.get("type") != "message":
+            return None
+        return self.emit(render_message(d, self.include_thinking, self.compactor))
+
+    def render_invalid(self, number, line, exc):
+        text = line.decode("utf-8", "replace")
+        return self.emit([f"> ⚠️ Skipped invalid JSONL line: `{text[:80]}…`\n"])
+
+    def footer(self) -> str:
+        return ("" if self.wrote_text else "*No messages found.*") + "\n"
+
+
+RENDERERS = {
+    "claude": ClaudeRenderer,
+    "codex": CodexRenderer,
+    "pi": PiRenderer,
+}
+
+CODEX_TYPES = {"session_meta", "response_item", "event_msg", "turn_context", "compacted"}
+CLAUDE_TYPES = {"user", "assistant", "summary", "system", "file-history-snapshot"}
+PI_TYPES = {"session", "message", "model_change", "thinking_level_change"}
+
+
+def detect_format(path: Path, sample: int = 50) -> str:
+    """Guess the log format from the first few entries."""
+    for count, (number, offset, line) in enumerate(iter_lines(path)):
+        if count >= sample:
+            break
+        try:
+            entry = loads(line)
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(entry, dict):
+            continue
+        entry_type = entry.get("type")
+        if entry_type in CODEX_TYPES and "payload" in entry:
+            return "codex"
+        if entry_type in PI_TYPES and entry_type != "message":
+            return "pi"
+        if entry_type == "message" and isinstance(entry.get("message"), dict):
+            return "pi"
+        if entry_type in CLAUDE_TYPES:
+            return "claude"
+    raise ValueError(f"Could not detect the log format of {path}")
+
+
+MANIFEST_NAME = ".transcript_to_markdown.json"
+
+
+def make_renderer(
+    fmt: str,
+    include_thinking: bool = True,
+    max_tool_result: int | None = None,
+    dedupe_tool_results: bool = False,
+) -> TranscriptRenderer:
+    compactor = None
+    if max_tool_result is not None or dedupe_tool_results:
+        compactor = ToolResultCompactor(max_tool_result, dedupe_tool_results)
+    return RENDERERS[fmt](include_thinking=include_thinking, compactor=compactor)
+
+
+def convert_file(source: Path, dest: Path, fmt: str = "auto", **options) -> tuple[str, int, int]:
+    """Convert one log file to dest, returning (format, entries rendered, tool result bytes saved)."""
+    if fmt == "auto":
+        fmt = detect_format(source)
+    renderer = make_renderer(fmt, **options)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(dest.name + ".tmp")
+    try:
+        with tmp.open("w", encoding="utf-8") as out:
+            count = convert(source, out, renderer)
+    except BaseException:
+        # The Codex renderer raises SystemExit on a bad line - drop the partial output
+        tmp.unlink(missing_ok=True)
+        raise
+    os.replace(tmp, dest)
+    saved = renderer.compactor.bytes_in - renderer.compactor.bytes_out if renderer.compactor else 0
+    return fmt, count, saved
+
+
+def batch_worker(job: tuple[Path, Path, str, dict]) -> tuple[Path, str | None, int, int, str | None]:
+    source, dest, fmt, options = job
+    try:
+        fmt, count, saved = convert_file(source, dest, fmt, **options)
+    except (Exception, SystemExit) as exc:
+        return source, None, 0, 0, str(exc) or exc.__class__.__name__
+    return source, fmt, count, saved, None
+
+
+def find_logs(root: Path) -> list[Path]:
+    return sorted(p for p in root.rglob("*.jsonl") if p.is_file())
+
+
+def load_manifest(path: Path) -> dict:
+    try:
+        with path.open(encoding="utf-8") as f:
+            manifest = json.load(f)
+        return manifest if isinstance(manifest, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(path: Path, manifest: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    os.replace(tmp, path)
+
+
+def convert_directory(
+    root: Path,
+    out_root: Path | None = None,
+    fmt: str = "auto",
+    jobs: int | None = None,
+    force: bool = False,
+    **options,
+) -> dict:
+    """Convert every .jsonl under root in parallel, skipping unchanged sources."""
+    started = time.perf_counter()
+    manifest_path = (out_root or root) / MANIFEST_NAME
+    manifest = {} if force else load_manifest(manifest_path)
+
+    work = []
+    skipped = 0
+    for source in find_logs(root):
+        relative = source.relative_to(root)
+        dest = (out_root / relative if out_root else source).with_suffix(".md")
+        stat = source.stat()
+        key = relative.as_posix()
+        signature = [stat.st_size, stat.st_mtime_ns]
+        entry = manifest.get(key, {})
+        if entry.get("source") == signature and entry.get("options", {}) == options and dest.exists():
+            skipped += 1
+            continue
+        work.append((key, signature, (source, dest, fmt, options)))
+
+    converted = failed = entries = 0
+    bytes_in = saved_bytes = 0
+    failures = []
+    if work:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = pool.map(batch_worker, [job for _, _, job in work], chunksize=4)
+            for (key, signature, _), (source, used_fmt, count, saved, error) in zip(work, results):
+                if error is not None:
+                    failed += 1
+                    failures.append((source, error))
+                    continue
+                converted += 1
+                entries += count
+                bytes_in += signature[0]
+                saved_bytes += saved
+                manifest[key] = {"source": signature, "format": used_fmt, "options": options}
+        save_manifest(manifest_path, manifest)
+
+    return {
+        "converted": converted,
+        "skipped": skipped,
+        "failed": failed,
+        "failures": failures,
+        "entries": entries,
+        "bytes_in": bytes_in,
+        "saved_bytes": saved_bytes,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def print_batch_summary(summary: dict) -> None:
+    for source, error in summary["failures"]:
+        print(f"Failed: {source}: {error}", file=sys.stderr)
+    seconds = summary["seconds"]
+    megabytes = summary["bytes_in"] / 1_000_000
+    rate = megabytes / seconds if seconds > 0 else 0.0
+    files_rate = summary["converted"] / seconds if seconds > 0 else 0.0
+    print(
+        f"Converted {summary['converted']} files ({summary['entries']} entries, {megabytes:.1f} MB), "
+        f"skipped {summary['skipped']} unchanged, {summary['failed']} failed "
+        f"in {seconds:.2f}s ({files_rate:.1f} files/s, {rate:.1f} MB/s)",
+        file=sys.stderr,
+    )
+    if summary["saved_bytes"] > 0:
+        print(f"Tool result limits saved {summary['saved_bytes']:,} bytes", file=sys.stderr)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("input", type=Path, help="Input .jsonl session file, or a directory to convert in bulk")
+    ap.add_argument("-o", "--output", default=None,
+                    help="Output .md path, or - for stdout (default: <input>.md). "
+                         "For a directory input, the directory to write .md files to (default: next to each .jsonl)")
+    ap.add_argument("-f", "--format", choices=["auto", *RENDERERS], default="auto",
+                    help="Log format (default: detect from the file)")
+    ap.add_argument("--no-thinking", action="store_true",
+                    help="Omit assistant thinking blocks")
+    ap.add_argument("-j", "--jobs", type=int, default=None,
+                    help="Worker processes for directory conversion (default: CPU count)")
+    ap.add_argument("--force", action="store_true",
+                    help="Reconvert every file in a directory, even if unchanged")
+    ap.add_argument("--max-tool-result", type=int, default=None, metavar="BYTES",
+                    help="Cap each tool result at BYTES, keeping the head and tail")
+    ap.add_argument("--dedupe-tool-results", action="store_true",
+                    help="Emit identical tool results once, then refer back to them by content hash")
+    ap.add_argument("--follow", action="store_true",
+                    help="Keep running and append Markdown as the log grows")
+    ap.add_argument("--poll-interval", type=float, default=1.0,
+                    help="Seconds between checks with --follow when inotify is unavailable (default: 1)")
+    args = ap.parse_args()
+
+    if not args.input.exists():
+        print(f"Error: File '{args.input}' not found.", file=sys.stderr)
+        return 1
+
+    options = {
+        "include_thinking": not args.no_thinking,
+        "max_tool_result": args.max_tool_result,
+        "dedupe_tool_results": args.dedupe_tool_results,
+    }
+
+    if args.input.is_dir():
+        if args.follow:
+            print("Error: --follow needs a single .jsonl file.", file=sys.stderr)
+            return 1
+        if args.output == "-":
+            print("Error: -o - is not supported for directory input.", file=sys.stderr)
+            return 1
+        summary = convert_directory(
+            args.input,
+            Path(args.output) if args.output else None,
+            fmt=args.format,
+            jobs=args.jobs,
+            force=args.force,
+            **options,
+        )
+        print_batch_summary(summary)
+        return 1 if summary["failed"] else 0
+
+    fmt = args.format
+    if fmt == "auto":
+        try:
+            fmt = detect_format(args.input)
+        except ValueError as exc:
+            print(f"Error: {exc}", file=sys.stderr)
+            return 1
+    renderer = make_renderer(fmt, **options)
+
+    def run(out: TextIO) -> int:
+        if args.follow:
+            return follow(args.input, out, renderer, args.poll_interval)
+        return convert(args.input, out, renderer)
+
+    if args.output == "-":
+        run(sys.stdout)
+        return 0
+
+    out_path = Path(args.output) if args.output else args.input.with_suffix(".md")
+    with out_path.open("w", encoding="utf-8") as out:
+        count = run(out)
+    print(f"Wrote {out_path} ({count} {fmt} entries)", file=sys.stderr)
+    if renderer.compactor is not None:
+        print(renderer.compactor.summary(), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,13 +14,44 @@ from __future__ import annotations
 import argparse
 import base64
 import datetime as _dt
+import hashlib
+import io
+import mmap
 import os
+import re
+import struct
 import sys
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import cbor2
 
+# A v2 archive is "\0webc" + "002", followed by sections that each start
+# with a one byte tag and a little-endian u64 length. The index section -
+# the root CBOR map - comes first, so its data starts at byte 17.
+SECTION_HEADER = struct.Struct("<BQ")
+INDEX_TAG = 1
+MANIFEST_TAG = 2
+VOLUME_TAG = 4
+DIRECTORY_TAG = 5
+FILE_TAG = 6
+ROOT_OFFSET = 8 + SECTION_HEADER.size
+ROOT_KEYS = ("manifest", "volumes", "signature")
+
+U64 = struct.Struct("<Q")
+# Extracted files and checksums are streamed in pieces of this size
+COPY_CHUNK = 1 << 20
+
+# A non-empty CBOR map (major type 5) whose first key is a text string
+# (major type 3) - the only kind of map worth trying to decode when scanning.
+# Maps of 24 or more entries (0xb8-0xbb) carry a 1, 2, 4 or 8 byte length
+# before the first key. A lookahead, so a header inside another candidate's
+# length bytes is still tried.
+CBOR_MAP_START = re.compile(
+    rb"(?=(?:[\xa1-\xb7\xbf]|\xb8.|\xb9.{2}|\xba.{4}|\xbb.{8})[\x60-\x7f])",
+    re.DOTALL,
+)
+
 
 def human_bytes(num: int) -> str:
     """Return a human-readable byte count."""
@@ -39,7 +70,7 @@ def human_bytes(num: int) -> str:
 def read_header(blob: bytes) -> Dict[str, Any]:
     if len(blob) < 9:
         raise ValueError("File is too small to be a WebC archive")
-    if not blob.startswith(b"\x00webc"):
+    if blob[:5] != b"\x00webc":
         raise ValueError("Missing WebC magic header")
     version = blob[1:8].decode("ascii", "replace")
     return {
@@ -48,29 +79,76 @@ def read_header(blob: bytes) -> Dict[str, Any]:
     }
 
 
+class BufferReader(io.RawIOBase):
+    """A read-only file object over a buffer that copies only what is read."""
+
+    def __init__(self, buffer: bytes, offset: int = 0):
+        self._view = memoryview(buffer)
+        self._pos = offset
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = max(0, min(len(b), len(self._view) - self._pos))
+        b[:n] = self._view[self._pos : self._pos + n]
+        self._pos += n
+        return n
+
+    def close(self) -> None:
+        self._view.release()
+        super().close()
+
+
+def decode_cbor_at(blob: bytes, offset: int) -> Any:
+    """
+    Decode the CBOR item starting at offset, reading only the bytes it
+    occupies rather than slicing off the rest of the archive.
+    """
+    with BufferReader(blob, offset) as reader:
+        return cbor2.load(reader)
+
+
+def read_root_index(blob: bytes) -> Optional[Tuple[int, Dict[str, Any]]]:
+    """Decode the root map from where the header layout says it starts."""
+    if len(blob) < ROOT_OFFSET or blob[8] != INDEX_TAG:
+        return None
+    try:
+        obj = decode_cbor_at(blob, ROOT_OFFSET)
+    except Exception:
+        return None
+    if isinstance(obj, dict) and all(key in obj for key in ROOT_KEYS):
+        return ROOT_OFFSET, obj
+    return None
+
+
 def locate_cbor_map(
-    blob: bytes, required_keys: Iterable[str], *, search_limit: Optional[int] = None
+    blob: bytes,
+    required_keys: Iterable[str],
+    *,
+    search_limit: Optional[int] = None,
+    start: int = 0,
 ) -> Tuple[int, Dict[str, Any]]:
-    """Scan `blob` for a CBOR map that contains the required keys."""
+    """Scan `blob` from `start` for a CBOR map that contains the required keys."""
     if search_limit is None:
-        search_limit = len(blob)
-    search_limit = min(search_limit, len(blob))
+        search_limit = len(blob) - start
+    end = min(start + search_limit, len(blob))
     required = tuple(required_keys)
-    for offset in range(search_limit):
-        initial = blob[offset]
-        if 0xA0 <= initial <= 0xBF:  # definite length map (major type 5)
-            try:
-                obj = cbor2.loads(blob[offset:])
-            except Exception:
-                continue
-            if isinstance(obj, dict) and all(key in obj for key in required):
-                return offset, obj
+    # Only offsets that pass the cheap header check are decoded at all
+    for match in CBOR_MAP_START.finditer(blob, start, end):
+        offset = match.start()
+        try:
+            obj = decode_cbor_at(blob, offset)
+        except Exception:
+            continue
+        if isinstance(obj, dict) and all(key in obj for key in required):
+            return offset, obj
     raise ValueError(
         f"Failed to locate CBOR map containing keys: {', '.join(required)}"
     )
 
 
-def read_span(blob: bytes, span: Dict[str, Any]) -> bytes:
+def span_bounds(blob: bytes, span: Dict[str, Any]) -> Tuple[int, int]:
     start = span.get("start")
     length = span.get("len")
     if not isinstance(start, int) or not isinstance(length, int):
@@ -78,7 +156,153 @@ def read_span(blob: bytes, span: Dict[str, Any]) -> bytes:
     end = start + length
     if end > len(blob):
         raise ValueError("Span exceeds file size")
-    return blob[start:end]
+    return start, end
+
+
+def read_section_map(
+    blob: bytes, span: Dict[str, Any], tag: int, required_keys: Iterable[str]
+) -> Dict[str, Any]:
+    """
+    Decode the CBOR map stored in a section. The span may or may not
+    include the section's tag and length, so try both before scanning.
+    """
+    start, end = span_bounds(blob, span)
+    required = tuple(required_keys)
+    candidates = [start]
+    if end - start > SECTION_HEADER.size and blob[start] == tag:
+        candidates.insert(0, start + SECTION_HEADER.size)
+    for offset in candidates:
+        try:
+            obj = decode_cbor_at(blob, offset)
+        except Exception:
+            continue
+        if isinstance(obj, dict) and all(key in obj for key in required):
+            return obj
+    return locate_cbor_map(blob, required, start=start, search_limit=end - start)[1]
+
+
+class Volume:
+    """
+    A volume section, read in place from the mapped archive:
+
+        name:   u64 length + UTF-8
+        header: u64 length + directory tree
+        data:   u64 length + concatenated file contents
+
+    The tree starts with the root directory at header offset 0:
+
+        directory: tag (5), u64 length, then entries of
+                   u64 header offset, 32 byte sha256, u64 name length, name
+        file:      tag (6), u64 start, u64 end (in data), 32 byte sha256
+    """
+
+    def __init__(self, blob: bytes, name: str, span: Dict[str, Any]):
+        self.blob = blob
+        self.name = name
+        start, end = span_bounds(blob, span)
+        pos = start
+        if end - start > SECTION_HEADER.size:
+            tag, length = SECTION_HEADER.unpack_from(blob, start)
+            if tag == VOLUME_TAG and length == end - start - SECTION_HEADER.size:
+                pos += SECTION_HEADER.size
+        name_len = self._u64(pos, end)
+        stored_name = bytes(blob[pos + 8 : pos + 8 + name_len])
+        if stored_name != name.encode("utf-8"):
+            raise ValueError(f"unrecognised layout for volume {name!r}")
+        pos += 8 + name_len
+        header_len = self._u64(pos, end)
+        self.header_start = pos + 8
+        self.header_end = self.header_start + header_len
+        data_len = self._u64(self.header_end, end)
+        self.data_start = self.header_end + 8
+        self.data_end = self.data_start + data_len
+        if self.data_end > end:
+            raise ValueError(f"volume {name!r} data exceeds its span")
+
+    def _u64(self, pos: int, limit: int) -> int:
+        if pos + 8 > limit:
+            raise ValueError(f"volume {self.name!r} is truncated")
+        return U64.unpack_from(self.blob, pos)[0]
+
+    def read_entry(self, offset: int) -> Tuple[str, Any]:
+        """Return ("dir", [(name, offset), ...]) or ("file", (start, end, sha256))."""
+        pos = self.header_start + offset
+        if pos >= self.header_end:
+            raise ValueError(f"bad entry offset {offset} in volume {self.name!r}")
+        tag = self.blob[pos]
+        if tag == DIRECTORY_TAG:
+            length = self._u64(pos + 1, self.header_end)
+            pos += 9
+            end = pos + length
+            children = []
+            while pos < end:
+                child = self._u64(pos, end)
+                name_len = self._u64(pos + 40, end)
+                name = str(self.blob[pos + 48 : pos + 48 + name_len], "utf-8")
+                children.append((name, child))
+                pos += 48 + name_len
+            return "dir", children
+        if tag == FILE_TAG:
+            start = self._u64(pos + 1, self.header_end)
+            end = self._u64(pos + 9, self.header_end)
+            checksum = bytes(self.blob[pos + 17 : pos + 49])
+            if not start <= end <= self.data_end - self.data_start:
+                raise ValueError(f"file span out of range in volume {self.name!r}")
+            return "file", (start, end, checksum)
+        raise ValueError(f"unknown entry tag {tag} in volume {self.name!r}")
+
+    def walk(self, path: str = "", offset: int = 0) -> Iterator[Tuple[str, str, Any]]:
+        """Yield (path, kind, info) for an entry and everything below it."""
+        kind, info = self.read_entry(offset)
+        yield path, kind, info
+        if kind == "dir":
+            for name, child in info:
+                if not name or name in (".", "..") or "/" in name:
+                    raise ValueError(f"unsafe file name {name!r} in volume {self.name!r}")
+                yield from self.walk(f"{path}/{name}" if path else name, child)
+
+    def lookup(self, path: str) -> int:
+        """Return the header offset of the entry at path."""
+        offset = 0
+        for part in [p for p in path.split("/") if p]:
+            kind, info = self.read_entry(offset)
+            children = dict(info) if kind == "dir" else {}
+            if part not in children:
+                raise KeyError(path)
+            offset = children[part]
+        return offset
+
+    def copy_file(self, info: Tuple[int, int, bytes], out) -> bool:
+        """
+        Stream a file's bytes from the mapping to out, hashing them on the
+        way, and return whether the checksum matched.
+        """
+        start, end, checksum = info
+        digest = hashlib.sha256()
+        with memoryview(self.blob) as view:
+            for pos in range(self.data_start + start, self.data_start + end, COPY_CHUNK):
+                chunk = view[pos : min(pos + COPY_CHUNK, self.data_start + end)]
+                digest.update(chunk)
+                out.write(chunk)
+                chunk.release()
+        return digest.digest() == checksum
+
+
+def span_checksum_ok(blob: bytes, meta: Dict[str, Any]) -> Optional[bool]:
+    """Hash a span in chunks and compare; None if there is no sha256 to check."""
+    checksum = meta.get("checksum") or {}
+    if "sha256" not in str(checksum.get("tag", "")) or not isinstance(
+        checksum.get("value"), bytes
+    ):
+        return None
+    start, end = span_bounds(blob, meta.get("span") or {})
+    digest = hashlib.sha256()
+    with memoryview(blob) as view:
+        for pos in range(start, end, COPY_CHUNK):
+            chunk = view[pos : min(pos + COPY_CHUNK, end)]
+            digest.update(chunk)
+            chunk.release()
+    return digest.digest() == checksum["value"][:32]
 
 
 def format_checksum(entry: Optional[Dict[str, Any]]) -> str:
@@ -179,7 +403,24 @@ def main(argv: Optional[Iterable[str]] = None) -> int:
         "--max-root-scan",
         type=int,
         default=1 << 20,
-        help="Number of initial bytes to scan when locating the root CBOR map",
+        help="Number of initial bytes to scan when the root CBOR map is not at "
+        "the offset given by the header layout",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    ls = subparsers.add_parser("ls", help="List the files in each volume")
+    ls.add_argument("volume", nargs="?", help="Only list this volume")
+    extract = subparsers.add_parser(
+        "extract", help="Extract a volume, or selected paths from it, to disk"
+    )
+    extract.add_argument("volume", help="Volume to extract from, e.g. atom")
+    extract.add_argument(
+        "paths", nargs="*", help="Files or directories to extract (default: all)"
+    )
+    extract.add_argument(
+        "-o", "--output", default=".", help="Directory to extract into"
+    )
+    subparsers.add_parser(
+        "verify", help="Check the sha256 checksums of the manifest, atoms and volumes"
     )
     args = parser.parse_args(argv)
 
@@ -188,15 +429,123 @@ def main(argv: Optional[Iterable[str]] = None) -> int:
         print(f"error: {path} is not a file", file=sys.stderr)
         return 1
 
-    data = path.read_bytes()
-    header = read_header(data)
+    # Memory-mapped, so only the pages that are actually looked at get read
+    with path.open("rb") as fh:
+        try:
+            data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            print(f"error: {path} is empty", file=sys.stderr)
+            return 1
     try:
-        root_offset, root = locate_cbor_map(
-            data, ["manifest", "volumes", "signature"], search_limit=args.max_root_scan
-        )
+        return inspect_archive(path, data, args)
+    finally:
+        data.close()
+
+
+def open_volumes(
+    data: mmap.mmap, root: Dict[str, Any], names: Optional[List[str]] = None
+) -> List[Volume]:
+    volumes = root.get("volumes") or {}
+    for name in names or []:
+        if name not in volumes:
+            raise ValueError(
+                f"no volume named {name!r} (have: {', '.join(volumes) or 'none'})"
+            )
+    return [
+        Volume(data, name, meta.get("span") or {})
+        for name, meta in volumes.items()
+        if not names or name in names
+    ]
+
+
+def list_volumes(data: mmap.mmap, root: Dict[str, Any], args: argparse.Namespace) -> int:
+    for volume in open_volumes(data, root, [args.volume] if args.volume else None):
+        print(f"{volume.name}:")
+        for path, kind, info in volume.walk():
+            if not path:
+                continue
+            if kind == "dir":
+                print(f"  {path}/")
+            else:
+                print(f"  {path}  ({human_bytes(info[1] - info[0])})")
+    return 0
+
+
+def extract_volume(data: mmap.mmap, root: Dict[str, Any], args: argparse.Namespace) -> int:
+    (volume,) = open_volumes(data, root, [args.volume])
+    dest = Path(args.output)
+    failures = files = total = 0
+    for selected in args.paths or [""]:
+        try:
+            offset = volume.lookup(selected)
+        except KeyError:
+            print(f"error: {selected} not found in volume {volume.name}", file=sys.stderr)
+            failures += 1
+            continue
+        # Keep the path of the selected entry, so "bin/tool" lands in DEST/bin/tool
+        for path, kind, info in volume.walk(selected.strip("/"), offset):
+            target = dest / path if path else dest
+            if kind == "dir":
+                target.mkdir(parents=True, exist_ok=True)
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with open(target, "wb") as out:
+                ok = volume.copy_file(info, out)
+            if not ok:
+                print(f"error: checksum mismatch for {path}", file=sys.stderr)
+                target.unlink()
+                failures += 1
+                continue
+            files += 1
+            total += info[1] - info[0]
+            print(f"{target}")
+    if failures:
+        status = f"{failures} failure(s)"
+    else:
+        status = "checksums verified"
+    print(
+        f"Extracted {files} file(s), {human_bytes(total)}, {status}",
+        file=sys.stderr,
+    )
+    return 1 if failures else 0
+
+
+def verify_archive(data: mmap.mmap, root: Dict[str, Any], args: argparse.Namespace) -> int:
+    sections = [("manifest", root.get("manifest")), ("atoms", root.get("atoms"))]
+    sections += [
+        (f"volume {name}", meta) for name, meta in (root.get("volumes") or {}).items()
+    ]
+    failures = 0
+    for label, meta in sections:
+        if not isinstance(meta, dict):
+            continue
+        ok = span_checksum_ok(data, meta)
+        status = {True: "ok", False: "MISMATCH", None: "no sha256 checksum"}[ok]
+        print(f"{label}: {status}")
+        failures += ok is False
+    return 1 if failures else 0
+
+
+COMMANDS = {"ls": list_volumes, "extract": extract_volume, "verify": verify_archive}
+
+
+def inspect_archive(path: Path, data: mmap.mmap, args: argparse.Namespace) -> int:
+    try:
+        header = read_header(data)
+        found = read_root_index(data)
+        if found is None:
+            found = locate_cbor_map(data, ROOT_KEYS, search_limit=args.max_root_scan)
     except ValueError as exc:
         print(f"error: {exc}", file=sys.stderr)
         return 1
+    root_offset, root = found
+
+    if args.command:
+        try:
+            return COMMANDS[args.command](data, root, args)
+        except ValueError as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 1
 
     stat = path.stat()
     print(f"Archive: {path}")
@@ -212,11 +561,8 @@ def main(argv: Optional[Iterable[str]] = None) -> int:
     span = manifest_meta.get("span")
     if isinstance(span, dict):
         try:
-            manifest_chunk = read_span(data, span)
-            _, manifest = locate_cbor_map(
-                manifest_chunk,
-                ["package", "commands"],
-                search_limit=len(manifest_chunk),
+            manifest = read_section_map(
+                data, span, MANIFEST_TAG, ["package", "commands"]
             )
         except ValueError as exc:
             print(f"warning: could not decode manifest content: {exc}")
@@ -4,60 +4,271 @@
 # ///
 
 import os
+import re
 import sys
+import time
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# Never descended into, in addition to anything starting with "."
+IGNORED_DIRS = {"node_modules", "__pycache__"}
 
-def is_text_file(file_path):
+
+# A newline followed by a line made up entirely of spaces and tabs. Matched
+# against the file contents with a b"\n" prepended, so that the first line is
+# covered too. Starting with a literal lets the regex engine skip quickly to
+# candidates, and the possessive ++ avoids backtracking. The line ending is
+# not part of the match, so \r\n files keep their line endings.
+WHITESPACE_LINE = re.compile(rb"\n[ \t\f\v]++(?=\r?\n|\Z)")
+
+
+def is_text(data):
     """
-    Check if a file is a text file by attempting to read it as UTF-8.
+    Check if file contents are text: no NUL bytes and valid UTF-8.
     """
+    if b"\0" in data:
+        return False
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            f.read(1024)  # Try reading a small chunk
-        return True
+        data.decode("utf-8")
     except UnicodeDecodeError:
         return False
-    except Exception:
-        return False
+    return True
+
+
+def write_atomically(file_path, data):
+    """
+    Replace the contents of file_path via a temporary file and os.replace(),
+    keeping its permissions, so an interrupted run never leaves it truncated.
+    """
+    # Write through symlinks rather than replacing them with a regular file
+    target = os.path.realpath(file_path)
+    mode = os.stat(target).st_mode
+    tmp = f"{target}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, mode)
+        os.replace(tmp, target)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
 
 
 def process_file(file_path, dry_run=False):
     """
     Process a single file, replacing lines with only whitespace with empty lines.
-    Returns a tuple of (file_path, changes_made, lines_changed)
+    Returns a tuple of (file_path, changes_made, lines_changed, bytes_read)
     """
-    if not is_text_file(file_path):
-        return file_path, False, 0
-
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-
-        changes_needed = False
-        lines_changed = 0
-        new_lines = []
-
-        for line in lines:
-            # Check if the line contains only whitespace characters (spaces, tabs)
-            # but is not already just a newline
-            if line.strip() == "" and line != "\n":
-                new_lines.append("\n")
-                changes_needed = True
-                lines_changed += 1
-            else:
-                new_lines.append(line)
+        with open(file_path, "rb") as f:
+            data = f.read()
+
+        # The common case: nothing to change, so no decoding or splitting
+        padded = b"\n" + data
+        if WHITESPACE_LINE.search(padded) is None or not is_text(data):
+            return file_path, False, 0, len(data)
+
+        new_data, lines_changed = WHITESPACE_LINE.subn(b"\n", padded)
+        new_data = new_data[1:]
 
-        if changes_needed and not dry_run:
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.writelines(new_lines)
+        if not dry_run:
+            write_atomically(file_path, new_data)
 
-        return file_path, changes_needed, lines_changed
+        return file_path, True, lines_changed, len(data)
 
     except Exception as e:
         print(f"Error processing {file_path}: {e}", file=sys.stderr)
-        return file_path, False, 0
+        return file_path, False, 0, 0
+
+
+def translate_gitignore_pattern(pattern):
+    """
+    Convert a .gitignore glob into a regular expression matched against a
+    path relative to the directory containing the .gitignore.
+    """
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    parts = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            parts.append("[^/]*")
+        elif c == "?":
+            parts.append("[^/]")
+        elif c == "\\" and i + 1 < len(pattern):
+            i += 1
+            parts.append(re.escape(pattern[i]))
+        elif c == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                parts.append(re.escape(c))
+            else:
+                body = pattern[i + 1 : end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                parts.append("[" + body.replace("\\", "\\\\") + "]")
+                i = end
+        else:
+            parts.append(re.escape(c))
+        i += 1
+    regex = "".join(parts)
+    if not anchored:
+        # A pattern without a slash matches at any depth
+        regex = "(?:.*/)?" + regex
+    return regex
+
+
+def read_gitignore(directory):
+    """
+    Return the rules from directory/.gitignore as a list of
+    (directory, compiled regex, negated, directory_only) tuples.
+    """
+    rules = []
+    try:
+        with open(os.path.join(directory, ".gitignore"), encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except (OSError, UnicodeDecodeError):
+        return rules
+    for line in lines:
+        if not line.strip() or line.startswith("#"):
+            continue
+        if not line.endswith("\\ "):
+            line = line.rstrip()
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        elif line.startswith(("\\!", "\\#")):
+            line = line[1:]
+        directory_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        try:
+            regex = re.compile(translate_gitignore_pattern(line))
+        except re.error:
+            continue
+        rules.append((directory, regex, negated, directory_only))
+    return rules
+
+
+def parent_gitignore_rules(directory):
+    """
+    Collect .gitignore rules from the enclosing git repository, down to (but
+    not including) directory itself.
+    """
+    directory = os.path.abspath(directory)
+    parents = []
+    current = os.path.dirname(directory)
+    if not os.path.exists(os.path.join(directory, ".git")):
+        while True:
+            parents.append(current)
+            if os.path.exists(os.path.join(current, ".git")):
+                break
+            parent = os.path.dirname(current)
+            if parent == current:
+                # Not inside a repository, so no parent rules apply
+                return []
+            current = parent
+    rules = []
+    for parent in reversed(parents):
+        rules.extend(read_gitignore(parent))
+    return rules
+
+
+def is_ignored(rules, path, is_dir):
+    """
+    Check an absolute path against .gitignore rules - the last match wins.
+    """
+    ignored = False
+    for directory, regex, negated, directory_only in rules:
+        if directory_only and not is_dir:
+            continue
+        if regex.fullmatch(path[len(directory) + 1 :]):
+            ignored = not negated
+    return ignored
+
+
+def walk_files(root, use_gitignore=True):
+    """
+    Yield the files below root, pruning hidden directories, IGNORED_DIRS and
+    anything matched by .gitignore before descending into them.
+    """
+    # Rules are matched against absolute paths, but paths are yielded
+    # relative to root as it was given
+    given = os.fspath(root)
+    root = os.path.abspath(given)
+    rules = parent_gitignore_rules(root) if use_gitignore else []
+    stack = [(root, rules)]
+    while stack:
+        directory, rules = stack.pop()
+        if use_gitignore:
+            rules = rules + read_gitignore(directory)
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError as e:
+            print(f"Error reading {directory}: {e}", file=sys.stderr)
+            continue
+        subdirectories = []
+        for entry in entries:
+            # Skip hidden files and directories
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name in IGNORED_DIRS:
+                    continue
+                if rules and is_ignored(rules, entry.path, True):
+                    continue
+                subdirectories.append((entry.path, rules))
+            elif entry.is_file():
+                if rules and is_ignored(rules, entry.path, False):
+                    continue
+                yield given + entry.path[len(root) :]
+        # Reversed so that directories come off the stack in sorted order
+        stack.extend(reversed(subdirectories))
+
+
+def clean_file(job):
+    file_path, dry_run = job
+    return process_file(file_path, dry_run)
+
+
+def collect_files(paths, use_gitignore=True):
+    for path_str in paths:
+        path = Path(path_str)
+
+        if not path.exists():
+            print(f"Path does not exist: {path}", file=sys.stderr)
+            continue
+
+        if path.is_file():
+            # Files named explicitly are always processed
+            yield str(path)
+        elif path.is_dir():
+            yield from walk_files(path, use_gitignore)
+
+
+def process_files(files, dry_run=False, jobs=None):
+    """
+    Run clean_file() over files, on a process pool unless jobs is 1.
+    """
+    work = ((file_path, dry_run) for file_path in files)
+    if jobs == 1:
+        yield from map(clean_file, work)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from pool.map(clean_file, work, chunksize=32)
 
 
 def main():
@@ -72,54 +283,62 @@ def main():
         action="store_true",
         help="Show what would be changed without making changes",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--no-gitignore",
+        action="store_true",
+        help="Also process files matched by .gitignore",
+    )
 
     args = parser.parse_args()
 
     total_files_processed = 0
     total_files_changed = 0
     total_lines_changed = 0
+    total_bytes = 0
 
-    for path_str in args.paths:
-        path = Path(path_str)
+    files = collect_files(args.paths, not args.no_gitignore)
+    show_progress = sys.stderr.isatty()
+    started = last_progress = time.perf_counter()
+    action = "Would replace" if args.dry_run else "Replaced"
 
-        if not path.exists():
-            print(f"Path does not exist: {path}", file=sys.stderr)
-            continue
+    for filepath, changed, lines, size in process_files(files, args.dry_run, args.jobs):
+        total_files_processed += 1
+        total_bytes += size
+        if changed:
+            total_files_changed += 1
+            total_lines_changed += lines
+            if show_progress:
+                print("\r\033[K", end="", file=sys.stderr, flush=True)
+            print(f"{action} {lines} whitespace-only line(s) in {filepath}")
+        if show_progress and time.perf_counter() - last_progress > 0.5:
+            last_progress = time.perf_counter()
+            print(
+                f"\rProcessed {total_files_processed} files...",
+                end="",
+                file=sys.stderr,
+                flush=True,
+            )
 
-        if path.is_file():
-            # Process a single file
-            filepath, changed, lines = process_file(path, args.dry_run)
-            total_files_processed += 1
-            if changed:
-                total_files_changed += 1
-                total_lines_changed += lines
-                action = "Would replace" if args.dry_run else "Replaced"
-                print(f"{action} {lines} whitespace-only line(s) in {filepath}")
-
-        elif path.is_dir():
-            # Recursively process a directory
-            for root, _, files in os.walk(path):
-                for file in files:
-                    filepath = os.path.join(root, file)
-                    filepath_obj = Path(filepath)
-
-                    # Skip hidden files and directories
-                    if filepath_obj.name.startswith(".") or any(
-                        part.startswith(".") for part in filepath_obj.parts
-                    ):
-                        continue
-
-                    filepath, changed, lines = process_file(filepath, args.dry_run)
-                    total_files_processed += 1
-                    if changed:
-                        total_files_changed += 1
-                        total_lines_changed += lines
-                        action = "Would replace" if args.dry_run else "Replaced"
-                        print(f"{action} {lines} whitespace-only line(s) in {filepath}")
+    if show_progress and last_progress > started:
+        print("\r\033[K", end="", file=sys.stderr)
+    seconds = time.perf_counter() - started
 
     # Print summary
     print(f"\nSummary:")
     print(f"Files processed: {total_files_processed}")
+    rate = total_files_processed / seconds if seconds else 0.0
+    megabytes = total_bytes / 1_000_000
+    throughput = megabytes / seconds if seconds else 0.0
+    print(
+        f"Time: {seconds:.2f}s ({rate:.0f} files/s, {megabytes:.1f} MB at {throughput:.1f} MB/s)"
+    )
 
     if args.dry_run:
         print(f"Files that would be changed: {total_files_changed}")